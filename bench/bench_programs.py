@@ -0,0 +1,102 @@
+# ============================================
+# 지원사업 레코드 메모리 / 직렬화 벤치마크
+# dict + jsonable_encoder (이전 방식) vs Program + orjson
+#
+# 실행: python bench/bench_programs.py [레코드 수]
+# ============================================
+
+import os
+import sys
+import json
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import main
+
+AGENCIES = ["중소벤처기업부", "과학기술정보통신부", "서울특별시", "경기도", "창업진흥원", "부산광역시"]
+
+def raw_items(count: int) -> list:
+    """업스트림 응답 한 건씩 (파싱 전 값)"""
+    items = []
+    for i in range(count):
+        agency = AGENCIES[i % len(AGENCIES)]
+        items.append({
+            "pbanc_sn": 100000 + i,
+            "biz_pbanc_nm": f"2025년 {agency} 창업기업 성장 지원사업 {i}차 모집 공고",
+            "excins_nm": "".join(agency),  # 업스트림처럼 레코드마다 별도 문자열
+            "aply_trgt_ctnt": "예비창업자 및 7년 이내 창업기업",
+            "pbanc_rcpt_bgng_dt": "20250401",
+            "pbanc_rcpt_end_dt": "20250430",
+            "supt_biz_clsfc": "사업화",
+            "detl_pg_url": f"https://www.k-startup.go.kr/web/contents/bizpbanc-ongoing.do?pbancSn={100000 + i}",
+            "supt_regin": "".join("전국"),
+            "rcrt_prgs_yn": "Y",
+        })
+    return items
+
+def parse_as_dict(item: dict) -> dict:
+    """이전 parse_kstartup_item"""
+    return {
+        "id": str(item.get("pbanc_sn", "")),
+        "name": item.get("biz_pbanc_nm", ""),
+        "agency": item.get("excins_nm", "창업진흥원"),
+        "target": item.get("aply_trgt_ctnt", item.get("aply_trgt", "")),
+        "period": f"{item.get('pbanc_rcpt_bgng_dt', '')} ~ {item.get('pbanc_rcpt_end_dt', '')}",
+        "support_amount": item.get("supt_biz_clsfc", ""),
+        "url": item.get("detl_pg_url", ""),
+        "region": item.get("supt_regin", "전국"),
+        "recruiting": item.get("rcrt_prgs_yn", ""),
+        "source": "K-Startup"
+    }
+
+def measure_memory(parse, items: list) -> tuple:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    programs = [parse(item) for item in items]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return programs, size
+
+def best_of(func, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def run_bench(count: int) -> dict:
+    items = raw_items(count)
+    dict_programs, dict_bytes = measure_memory(parse_as_dict, items)
+    record_programs, record_bytes = measure_memory(main.parse_kstartup_item, items)
+
+    # 두 방식의 JSON이 같은지 먼저 확인
+    assert json.loads(main.dump_json(record_programs)) == json.loads(json.dumps(dict_programs, ensure_ascii=False))
+
+    payload_dict = {"count": count, "programs": dict_programs}
+    payload_record = {"count": count, "programs": record_programs}
+    encoder_seconds = best_of(lambda: JSONResponse(jsonable_encoder(payload_dict)))
+    orjson_seconds = best_of(lambda: main.FastJSONResponse(payload_record))
+
+    return {
+        "records": count,
+        "memory_bytes_per_record": {
+            "dict": round(dict_bytes / count, 1),
+            "program": round(record_bytes / count, 1),
+        },
+        "serialize_ms": {
+            "jsonable_encoder+json": round(encoder_seconds * 1000, 2),
+            "orjson": round(orjson_seconds * 1000, 2),
+        },
+        "serialize_speedup": round(encoder_seconds / orjson_seconds, 1),
+    }
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(json.dumps(run_bench(count), ensure_ascii=False, indent=2))
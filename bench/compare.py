@@ -0,0 +1,72 @@
+# ============================================
+# 두 벤치마크 결과 비교 - 지연/시간 지표는 증가, 처리량은 감소를 회귀로 표시
+#
+# 실행: python bench/compare.py 이전.json 현재.json [--threshold 10]
+# 회귀가 있으면 종료 코드 1
+# ============================================
+
+import sys
+import json
+import math
+import argparse
+
+def flatten(data, prefix: str = "") -> dict:
+    """중첩 결과 → {"load.match.latency_ms.p95": 값} (숫자만)"""
+    values = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[path] = value
+    return values
+
+def direction(path: str) -> int:
+    """1: 클수록 나쁨, -1: 작을수록 나쁨, 0: 비교하지 않음"""
+    if path.startswith("config.") or path.endswith((".requests", ".concurrency", ".programs", "records.records")):
+        return 0
+    if "throughput" in path or "speedup" in path:
+        return -1
+    # serialize_ms.orjson 처럼 단위가 중간 경로에 있는 지표도 포함
+    if "latency_ms" in path or "_ms." in path or path.endswith(("_ms", ".elapsed_seconds")) or ".errors" in path or "bytes" in path:
+        return 1
+    return 0
+
+def compare(before: dict, after: dict, threshold: float) -> list:
+    old, new = flatten(before), flatten(after)
+    rows = []
+    for path in sorted(old.keys() & new.keys()):
+        sign = direction(path)
+        if sign == 0:
+            continue
+        if not old[path]:
+            # 기준값이 0이면 변화율을 계산할 수 없음 - 클수록 나쁜 지표(오류 수 등)가 0에서 늘면 회귀
+            if sign == 1 and new[path] > 0:
+                rows.append((path, old[path], new[path], math.inf, True))
+            continue
+        change = (new[path] - old[path]) / abs(old[path]) * 100
+        rows.append((path, old[path], new[path], change, sign * change > threshold))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="벤치마크 결과 비교")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10, help="회귀로 볼 변화율 (%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)
+
+    rows = compare(before, after, args.threshold)
+    print(f"{before.get('revision', args.before)} -> {after.get('revision', args.after)}")
+    for path, old, new, change, regressed in rows:
+        print(f"{'!' if regressed else ' '} {path:60s} {old:>12g} -> {new:>12g} ({change:+.1f}%)")
+    regressions = sum(1 for row in rows if row[4])
+    print(f"회귀 {regressions}건 (기준 {args.threshold:g}%)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
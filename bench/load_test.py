@@ -0,0 +1,142 @@
+# ============================================
+# 부하 시나리오 - 처리량과 p50/p95/p99 지연을 JSON으로 출력
+#
+# 실행: python bench/load_test.py --base-url http://127.0.0.1:8000 --scenario all --requests 200 --concurrency 20
+# ============================================
+
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+from collections import defaultdict
+
+import httpx
+
+PROPOSAL_TEXT = "AI 비전 검사로 제조 공정 불량을 줄이는 스타트업입니다. 직원 12명, 시제품 완료, 중소 제조사 3곳과 실증 중."
+N2B = {
+    "not": "수작업 검사로 불량률이 높음",
+    "but": "AI 비전 검사 자동화",
+    "because": "시범 라인에서 불량률 40% 감소",
+    "keywords": ["스마트공장", "AI", "제조", "디지털 전환"],
+}
+
+def programs_all(i: int) -> tuple:
+    return "GET", "/api/programs/all", {"params": {"region": ["전체", "서울", "경기", "부산"][i % 4]}}
+
+def programs_page(i: int) -> tuple:
+    return "GET", "/api/programs/all", {"params": {"limit": 50, "fields": "id,name,period"}}
+
+def match(i: int) -> tuple:
+    # 요청마다 분석 내용을 달리해 LLM 호출이 합쳐지지 않게 함
+    n2b = {**N2B, "not": f"{N2B['not']} #{i}"}
+    return "POST", "/match", {"json": {"apiKey": "bench", "n2bAnalysis": n2b, "region": ["전체", "서울"][i % 2]}}
+
+def demo_analyze(i: int) -> tuple:
+    return "POST", "/demo/analyze", {"json": {"proposalText": f"{PROPOSAL_TEXT} (요청 {i})"}}
+
+def demo_proposal(i: int) -> tuple:
+    return "POST", "/demo/proposal", {"json": {
+        "companyInfo": f"{PROPOSAL_TEXT} (요청 {i})",
+        "n2bResult": N2B,
+        "selectedProgram": {"name": "스마트공장 구축 지원사업", "agency": "중소벤처기업부"},
+    }}
+
+SCENARIOS = {
+    "programs_all": programs_all,
+    "programs_page": programs_page,
+    "match": match,
+    "demo_analyze": demo_analyze,
+    "demo_proposal": demo_proposal,
+}
+
+def percentile(ordered: list, q: float) -> float:
+    """nearest-rank 백분위"""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+def summarize(latencies: list, statuses: dict, errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    ms = lambda v: round(v * 1000, 2) if v is not None else None
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors + sum(n for code, n in statuses.items() if not 200 <= int(code) < 400),
+        "status_codes": dict(statuses),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        "latency_ms": {
+            "mean": ms(sum(ordered) / len(ordered)) if ordered else None,
+            "p50": ms(percentile(ordered, 0.50)),
+            "p95": ms(percentile(ordered, 0.95)),
+            "p99": ms(percentile(ordered, 0.99)),
+            "max": ms(ordered[-1]) if ordered else None,
+        },
+    }
+
+async def run_scenario(client: httpx.AsyncClient, name: str, requests: int, concurrency: int) -> dict:
+    """closed-loop: concurrency개의 작업자가 요청을 하나씩 끝내고 다음 요청을 보냄"""
+    build = SCENARIOS[name]
+    counter = iter(range(requests))
+    latencies = []
+    statuses = defaultdict(int)
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, path, kwargs = build(i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                await response.aread()
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, errors, time.perf_counter() - started)
+
+async def run(base_url: str, scenarios: list, requests: int, concurrency: int, warmup: int, timeout: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        results = {}
+        for name in scenarios:
+            if warmup:
+                await run_scenario(client, name, warmup, min(warmup, concurrency))
+            results[name] = {"concurrency": concurrency, **await run_scenario(client, name, requests, concurrency)}
+            print(f"{name}: {results[name]['throughput_rps']} rps, p95 {results[name]['latency_ms']['p95']} ms", file=sys.stderr)
+        return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="N2B 백엔드 부하 시나리오")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", default="all", help=f"all 또는 쉼표로 구분: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", help="결과 JSON 파일 (없으면 stdout)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = list(SCENARIOS) if args.scenario == "all" else [s.strip() for s in args.scenario.split(",")]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"알 수 없는 시나리오: {', '.join(unknown)}")
+    results = asyncio.run(run(args.base_url, scenarios, args.requests, args.concurrency, args.warmup, args.timeout))
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# ============================================
+# 마이크로 벤치마크 - 지역 필터 / 예상 공고 / 검색 / 매칭 후보 선정
+#
+# 실행: python bench/micro_benchmarks.py --programs 5000 --output micro.json
+# ============================================
+
+import os
+import sys
+import re
+import json
+import time
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+
+import main
+from payloads import program_records, program_rows, REGIONS
+
+N2B = {
+    "not": "수작업 검사로 불량률이 높음",
+    "but": "AI 비전 검사 자동화",
+    "because": "시범 라인에서 불량률 40% 감소",
+    "keywords": ["스마트공장", "AI", "제조", "디지털 전환"],
+}
+
+def timeit(func, repeat: int = 5, number: int = 1) -> dict:
+    """repeat번 측정해 1회당 최소/중앙값 (밀리초)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number)
+    timings.sort()
+    return {"min_ms": round(timings[0] * 1000, 4), "median_ms": round(timings[len(timings) // 2] * 1000, 4)}
+
+def region_benchmarks(programs: list) -> dict:
+    partitions = main.build_region_partitions(programs)
+    regions = REGIONS[:6]
+    return {
+        "build_partitions": timeit(lambda: main.build_region_partitions(programs)),
+        # 파티션이 없을 때의 경로 (사업마다 지역 판별)
+        "scan_filter_per_region": timeit(lambda: [main.program_in_region(p, "서울") for p in programs]),
+        "partition_lookup_6_regions": timeit(lambda: [partitions.get(r, []) for r in regions], number=1000),
+    }
+
+def expected_history(count: int) -> list:
+    """연도만 다른 같은 공고를 여러 번 넣은 저장소 이력"""
+    history = []
+    for year in (2024, 2025, 2026):
+        for i, row in enumerate(program_rows(count, seed=7)):
+            # 합성 사업명은 조합 수가 적으므로 번호를 붙여 서로 다른 공고로 만듦
+            name = re.sub(r"20\d{2}년", f"{year}년", row["name"]) + f" {i}"
+            history.append(({"name": name, "agency": row["agency"], "period": f"{year}{row['begin'][4:]} ~ {year}{row['end'][4:]}"}, 0))
+    return history
+
+def expected_benchmarks(count: int) -> dict:
+    history = expected_history(count)
+    results = {
+        "mine_history": timeit(lambda: main.mine_recurring_programs(history), repeat=3),
+    }
+    mined = main.mine_recurring_programs(history)
+    results["build_index"] = timeit(lambda: main.build_expected_index(mined), repeat=3)
+    main.expected_index = main.build_expected_index(mined)
+    results["recurring_programs"] = len(main.expected_index["programs"])
+    results["lookup_1_keyword"] = timeit(lambda: main.get_expected_programs(["AI"]), number=200)
+    results["lookup_4_keywords"] = timeit(lambda: main.get_expected_programs(N2B["keywords"]), number=200)
+    return results
+
+def search_benchmarks(view: dict) -> dict:
+    """카탈로그 뷰(요청 경로와 같은 인덱스)를 대상으로 측정"""
+    programs = view["programs"]
+    seoul = view["partitions"].get("서울", [])
+    return {
+        "build_index": timeit(lambda: main.build_search_index(programs), repeat=3),
+        "keyword_search": timeit(lambda: main.search_index(view["index"], "스마트공장"), number=50),
+        "bm25_rank_top50": timeit(lambda: main.rank_programs(programs, N2B), number=20),
+        "bm25_rank_top50_region": timeit(lambda: main.rank_programs(seoul, N2B), number=20),
+    }
+
+def catalog_benchmarks(sources: list, view: dict) -> dict:
+    merged = view["programs"]
+    matched = [{"name": p["name"]} for p in merged[:5]]
+    by_id = [{"id": main.program_ref(p), "name": p["name"]} for p in merged[:5]]
+    return {
+        "dedupe": timeit(lambda: main.dedupe_programs(sources), repeat=3),
+        "build_match_lookup": timeit(lambda: main.build_program_lookup(merged), repeat=3),
+        "reconcile_5_by_id": timeit(lambda: main.reconcile_matches([dict(m) for m in by_id], merged), number=200),
+        "reconcile_5_by_name": timeit(lambda: main.reconcile_matches([dict(m) for m in matched], merged), number=200),
+        "merged_programs": len(merged),
+    }
+
+def run(count: int) -> dict:
+    programs = program_records(count)
+    half = count // 2
+    sources = [programs[:half], programs[half:]]
+    view = main.get_catalog_view(sources)
+    return {
+        "programs": count,
+        "region": region_benchmarks(programs),
+        "expected": expected_benchmarks(count),
+        "search": search_benchmarks(view),
+        "catalog": catalog_benchmarks(sources, view),
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="N2B 마이크로 벤치마크")
+    parser.add_argument("--programs", type=int, default=5000)
+    parser.add_argument("--output", help="결과 JSON 파일 (없으면 stdout)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    output = json.dumps(run(args.programs), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
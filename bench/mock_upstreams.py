@@ -0,0 +1,177 @@
+# ============================================
+# 로컬 업스트림 대역 서버 (기업마당 / K-Startup / Anthropic Messages API)
+#
+# 실행: python bench/mock_upstreams.py --port 9100 --bizinfo-total 3000 --latency-ms 200
+# 백엔드 환경 변수:
+#   BIZINFO_URL=http://127.0.0.1:9100/bizinfo
+#   KSTARTUP_URL=http://127.0.0.1:9100/kstartup
+#   ANTHROPIC_BASE_URL=http://127.0.0.1:9100   (anthropic SDK가 직접 읽음)
+# ============================================
+
+import os
+import sys
+import re
+import json
+import random
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import uvicorn
+
+from payloads import program_rows, bizinfo_xml, kstartup_json
+
+config = {
+    "bizinfo_total": int(os.getenv("MOCK_BIZINFO_TOTAL", "2000")),
+    "kstartup_total": int(os.getenv("MOCK_KSTARTUP_TOTAL", "1500")),
+    "latency_ms": float(os.getenv("MOCK_LATENCY_MS", "150")),  # 업스트림 응답 지연
+    "jitter_ms": float(os.getenv("MOCK_JITTER_MS", "50")),
+    "ttft_ms": float(os.getenv("MOCK_LLM_TTFT_MS", "400")),  # 첫 토큰까지 시간
+    "tokens_per_sec": float(os.getenv("MOCK_LLM_TOKENS_PER_SEC", "80")),
+    "output_tokens": int(os.getenv("MOCK_LLM_OUTPUT_TOKENS", "600")),  # 제안서/PPT 응답 길이
+    "seed": int(os.getenv("MOCK_SEED", "42")),
+}
+catalog = {}
+stats = {"bizinfo": 0, "kstartup": 0, "messages": 0}
+
+app = FastAPI(title="N2B bench mock upstreams")
+
+def rows_for(source: str) -> list:
+    if source not in catalog:
+        total = config[f"{source}_total"]
+        offset = 0 if source == "bizinfo" else 100000
+        catalog[source] = program_rows(total, config["seed"] + (source == "kstartup"), offset)
+    return catalog[source]
+
+async def upstream_delay():
+    delay = config["latency_ms"] + random.uniform(-config["jitter_ms"], config["jitter_ms"])
+    await asyncio.sleep(max(0.0, delay) / 1000)
+
+@app.get("/bizinfo")
+async def bizinfo(request: Request):
+    stats["bizinfo"] += 1
+    await upstream_delay()
+    params = request.query_params
+    rows = rows_for("bizinfo")
+    unit = int(params.get("pageUnit") or params.get("searchCnt") or 100)
+    page = int(params.get("pageIndex") or 1)
+    start = (page - 1) * unit
+    return Response(content=bizinfo_xml(rows[start:start + unit], len(rows)), media_type="application/xml")
+
+@app.get("/kstartup")
+async def kstartup(request: Request):
+    stats["kstartup"] += 1
+    await upstream_delay()
+    params = request.query_params
+    rows = rows_for("kstartup")
+    per_page = int(params.get("perPage") or 10)
+    page = int(params.get("page") or 1)
+    start = (page - 1) * per_page
+    return JSONResponse(kstartup_json(rows[start:start + per_page], len(rows), page, per_page))
+
+# ============================================
+# Anthropic Messages API 대역
+# ============================================
+def prompt_text(body: dict) -> str:
+    parts = []
+    for message in body.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get("text", "") for block in content or [])
+    return "\n".join(parts)
+
+def reply_for(prompt: str, max_tokens: int) -> str:
+    """프롬프트 종류별 그럴듯한 응답 (분석 JSON / 추천 JSON 배열 / 긴 본문)"""
+    if "N2B 프레임워크로 분석" in prompt:
+        return json.dumps({
+            "not": "수작업 공정으로 불량률이 높음",
+            "but": "AI 비전 검사로 자동화",
+            "because": "시범 라인에서 불량률 40% 감소",
+            "keywords": ["스마트공장", "AI", "제조", "디지털 전환"],
+            "summary": "AI 기반 제조 공정 자동화 기업",
+        }, ensure_ascii=False)
+    if "추천" in prompt and "fit_score" in prompt:
+        refs = re.findall(r"\[([BK]-[^\]]+)\] ([^|\n]+)", prompt)[:5]
+        return json.dumps([
+            {"id": ref, "name": name.strip(), "agency": "", "period": "", "reason": "N2B 분석과 부합", "fit_score": 90 - i * 5}
+            for i, (ref, name) in enumerate(refs)
+        ], ensure_ascii=False)
+    tokens = min(max_tokens, config["output_tokens"])
+    return "".join(f"제안서 본문 토큰{i % 10} " for i in range(tokens // 3))
+
+def token_chunks(text: str) -> list:
+    """대략 토큰 단위(3글자)로 자른 조각"""
+    return [text[i:i + 3] for i in range(0, len(text), 3)] or [""]
+
+def usage(prompt: str, output_tokens: int) -> dict:
+    return {
+        "input_tokens": len(prompt) // 2,
+        "output_tokens": output_tokens,
+        "cache_read_input_tokens": 0,
+        "cache_creation_input_tokens": 0,
+    }
+
+@app.post("/v1/messages")
+async def messages(request: Request):
+    stats["messages"] += 1
+    body = await request.json()
+    prompt = prompt_text(body)
+    text = reply_for(prompt, body.get("max_tokens", 1024))
+    chunks = token_chunks(text)
+    message_id = f"msg_bench_{stats['messages']}"
+    model = body.get("model", "claude-bench")
+    per_token = 1.0 / config["tokens_per_sec"] if config["tokens_per_sec"] > 0 else 0.0
+
+    if not body.get("stream"):
+        await asyncio.sleep(config["ttft_ms"] / 1000 + per_token * len(chunks))
+        return JSONResponse({
+            "id": message_id,
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": usage(prompt, len(chunks)),
+        })
+
+    def event(name: str, data: dict) -> str:
+        return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    async def stream():
+        await asyncio.sleep(config["ttft_ms"] / 1000)
+        yield event("message_start", {"type": "message_start", "message": {
+            "id": message_id, "type": "message", "role": "assistant", "model": model, "content": [],
+            "stop_reason": None, "stop_sequence": None, "usage": usage(prompt, 1),
+        }})
+        yield event("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+        for chunk in chunks:
+            await asyncio.sleep(per_token)
+            yield event("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}})
+        yield event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        yield event("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None}, "usage": {"output_tokens": len(chunks)}})
+        yield event("message_stop", {"type": "message_stop"})
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+@app.get("/stats")
+async def mock_stats():
+    return {"config": config, "calls": stats}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="N2B 벤치마크용 업스트림 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    for key, value in config.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(value), default=value)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    config.update({key: getattr(args, key) for key in config})
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,99 @@
+# ============================================
+# 벤치마크용 합성 데이터 (기업마당 XML / K-Startup JSON / 사업 목록)
+# 같은 seed면 항상 같은 데이터 - 커밋 간 결과 비교용
+# ============================================
+
+import random
+from xml.sax.saxutils import escape
+
+REGIONS = ["서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종", "경기", "강원", "충북", "충남", "전북", "전남", "경북", "경남", "제주"]
+NATIONAL_AGENCIES = ["중소벤처기업부", "과학기술정보통신부", "산업통상자원부", "농림축산식품부", "문화체육관광부", "창업진흥원", "정보통신산업진흥원"]
+LOCAL_AGENCY_SUFFIX = {"서울": "서울특별시", "부산": "부산광역시", "경기": "경기도", "제주": "제주특별자치도"}
+TOPICS = [
+    "스마트공장", "AI 바우처", "수출바우처", "스마트팜", "창업성장기술개발", "R&D 기술사업화", "콘텐츠 제작",
+    "관광벤처", "바이오 헬스", "의료기기 실증", "탄소중립 설비", "디지털 전환", "소상공인 온라인 판로",
+    "청년창업사관학교", "로봇 실증", "반도체 소부장", "물류 혁신", "글로벌 진출", "지식재산 창출", "에너지 효율화",
+]
+SUFFIXES = ["지원사업", "육성사업", "고도화 사업", "바우처", "실증 지원", "기업 모집"]
+
+def program_rows(count: int, seed: int = 42, id_offset: int = 0) -> list:
+    """업스트림 공통 필드 기준 합성 공고 (지역 공고 / 전국 공고 / 지역명 없는 공고 혼합)"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        region = rng.choice(REGIONS)
+        kind = rng.random()
+        topic = rng.choice(TOPICS)
+        year = rng.choice([2024, 2025, 2026])
+        month = rng.randint(1, 12)
+        if kind < 0.45:
+            agency = LOCAL_AGENCY_SUFFIX.get(region, f"{region}테크노파크")
+            name = f"[{region}] {year}년 {topic} {rng.choice(SUFFIXES)} {rng.randint(1, 3)}차 공고"
+        elif kind < 0.85:
+            agency = rng.choice(NATIONAL_AGENCIES)
+            name = f"{year}년 {topic} {rng.choice(SUFFIXES)} 모집 공고"
+        else:
+            agency = f"{rng.choice(['한국', '재단법인 ', '(사)'])}{topic[:2]}진흥원"
+            name = f"{topic} {rng.choice(SUFFIXES)}"
+        rows.append({
+            "id": str(id_offset + i),
+            "name": name,
+            "agency": agency,
+            "target": rng.choice(["중소기업", "예비창업자", "창업 7년 이내 기업", "소상공인", "중견기업"]),
+            "begin": f"{year}{month:02d}{rng.randint(1, 15):02d}",
+            "end": f"{year}{month:02d}{rng.randint(16, 28):02d}",
+            "amount": rng.choice(["최대 1억원", "최대 5천만원", "사업화 자금", "기술개발 자금", ""]),
+            "region": region if kind < 0.45 else "전국",
+        })
+    return rows
+
+def bizinfo_xml(rows: list, total: int) -> str:
+    """bizinfoApi.do 응답 형식 (<item>마다 totCnt 포함)"""
+    items = "".join(
+        "<item>"
+        f"<pblancId>PBLN_{int(r['id']):012d}</pblancId>"
+        f"<pblancNm>{escape(r['name'])}</pblancNm>"
+        f"<jrsdInsttNm>{escape(r['agency'])}</jrsdInsttNm>"
+        f"<trgetNm>{escape(r['target'])}</trgetNm>"
+        f"<reqstBeginEndDe>{r['begin']} ~ {r['end']}</reqstBeginEndDe>"
+        f"<sprtCn>{escape(r['amount'])}</sprtCn>"
+        f"<totCnt>{total}</totCnt>"
+        "</item>"
+        for r in rows
+    )
+    return f"<?xml version=\"1.0\" encoding=\"UTF-8\"?><rss version=\"2.0\"><channel><title>기업마당</title>{items}</channel></rss>"
+
+def kstartup_json(rows: list, total: int, page: int, per_page: int) -> dict:
+    """getAnnouncementInformation01 응답 형식"""
+    return {
+        "currentCount": len(rows),
+        "matchCount": total,
+        "page": page,
+        "perPage": per_page,
+        "totalCount": total,
+        "data": [
+            {
+                "pbanc_sn": int(r["id"]),
+                "biz_pbanc_nm": r["name"],
+                "excins_nm": r["agency"],
+                "aply_trgt_ctnt": r["target"],
+                "pbanc_rcpt_bgng_dt": r["begin"],
+                "pbanc_rcpt_end_dt": r["end"],
+                "supt_biz_clsfc": r["amount"],
+                "detl_pg_url": f"https://www.k-startup.go.kr/web/contents/bizpbanc-ongoing.do?schM=view&pbancSn={r['id']}",
+                "supt_regin": r["region"],
+                "rcrt_prgs_yn": "Y",
+            }
+            for r in rows
+        ],
+    }
+
+def program_records(count: int, seed: int = 42) -> list:
+    """main.Program 목록 (두 소스 반씩) - 마이크로 벤치마크용"""
+    import main
+    import xml.etree.ElementTree as ET
+    half = count // 2
+    biz_root = ET.fromstring(bizinfo_xml(program_rows(half, seed), half))
+    bizinfo = [main.parse_bizinfo_item(item) for item in biz_root.iter("item")]
+    kstartup = [main.parse_kstartup_item(item) for item in kstartup_json(program_rows(count - half, seed + 1, 100000), count - half, 1, count - half)["data"]]
+    return bizinfo + kstartup
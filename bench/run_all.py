@@ -0,0 +1,154 @@
+# ============================================
+# 벤치마크 전체 실행 - 대역 서버와 백엔드를 띄우고 부하/마이크로 벤치마크 결과를 한 파일로 저장
+#
+# 실행: python bench/run_all.py --output bench/results/$(git rev-parse --short HEAD).json
+# 비교: python bench/compare.py bench/results/<이전>.json bench/results/<현재>.json
+# ============================================
+
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import load_test
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, text=True).strip()
+    except Exception:
+        return "unknown"
+
+def wait_until(url: str, timeout: float, expect=(200,)):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code in expect:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} 가 {timeout:g}초 안에 준비되지 않았습니다.")
+
+def start_mock(args, port: int) -> subprocess.Popen:
+    command = [
+        sys.executable, os.path.join(BENCH_DIR, "mock_upstreams.py"), "--port", str(port),
+        "--bizinfo-total", str(args.bizinfo_total), "--kstartup-total", str(args.kstartup_total),
+        "--latency-ms", str(args.latency_ms), "--tokens-per-sec", str(args.tokens_per_sec),
+        "--ttft-ms", str(args.ttft_ms), "--output-tokens", str(args.output_tokens),
+    ]
+    return subprocess.Popen(command, cwd=REPO_DIR)
+
+def start_backend(port: int, mock_url: str, workdir: str, workers: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "BIZINFO_URL": f"{mock_url}/bizinfo",
+        "KSTARTUP_URL": f"{mock_url}/kstartup",
+        "ANTHROPIC_BASE_URL": mock_url,
+        "ANTHROPIC_API_KEY": "bench",
+        # 데모 한도/캐시가 측정을 가리지 않게
+        "MAX_DAILY_REQUESTS": "100000000",
+        "RATE_LIMIT_CLIENT_BURST": "100000000",
+        "RATE_LIMIT_DB_PATH": os.path.join(workdir, "ratelimit.db"),
+        "PROGRAM_DB_PATH": os.path.join(workdir, "programs.db"),
+        "ANALYSIS_CACHE_DB_PATH": "",
+    }
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    return subprocess.Popen(command, cwd=REPO_DIR, env=env)
+
+def stop(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="N2B 벤치마크 전체 실행")
+    parser.add_argument("--output", help="결과 JSON 파일 (없으면 stdout)")
+    parser.add_argument("--scenario", default="all")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1, help="백엔드 uvicorn 워커 수")
+    parser.add_argument("--bizinfo-total", type=int, default=2000)
+    parser.add_argument("--kstartup-total", type=int, default=1500)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--tokens-per-sec", type=float, default=80)
+    parser.add_argument("--ttft-ms", type=float, default=400)
+    parser.add_argument("--output-tokens", type=int, default=600)
+    parser.add_argument("--micro-programs", type=int, default=5000)
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--skip-micro", action="store_true")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = {
+        "revision": git_revision(),
+        "started_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": vars(args),
+    }
+
+    if not args.skip_load:
+        mock_port, backend_port = free_port(), free_port()
+        mock_url = f"http://127.0.0.1:{mock_port}"
+        backend_url = f"http://127.0.0.1:{backend_port}"
+        with tempfile.TemporaryDirectory() as workdir:
+            mock = start_mock(args, mock_port)
+            backend = None
+            try:
+                wait_until(f"{mock_url}/stats", 30)
+                backend = start_backend(backend_port, mock_url, workdir, args.workers)
+                # 카탈로그 워밍업이 끝나야 /ready가 200
+                wait_until(f"{backend_url}/ready", 120)
+                results["load"] = load_test.main([
+                    "--base-url", backend_url, "--scenario", args.scenario,
+                    "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+                    "--output", os.path.join(workdir, "load.json"),
+                ])
+                results["upstream_calls"] = httpx.get(f"{mock_url}/stats").json()["calls"]
+            finally:
+                if backend is not None:
+                    stop(backend)
+                stop(mock)
+
+    if not args.skip_micro:
+        micro = subprocess.run(
+            [sys.executable, os.path.join(BENCH_DIR, "micro_benchmarks.py"), "--programs", str(args.micro_programs)],
+            cwd=REPO_DIR, env={**os.environ, "PROGRAM_DB_PATH": ""}, check=True, capture_output=True, text=True,
+        )
+        results["micro"] = json.loads(micro.stdout)
+        records = subprocess.run(
+            [sys.executable, os.path.join(BENCH_DIR, "bench_programs.py"), str(args.micro_programs)],
+            cwd=REPO_DIR, check=True, capture_output=True, text=True,
+        )
+        results["records"] = json.loads(records.stdout)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
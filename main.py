@@ -3,21 +3,52 @@
 # 기업마당 + K-Startup 실시간 연동 + 데모용 API
 # ============================================
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import anthropic
 import httpx
+import orjson
 import xml.etree.ElementTree as ET
 from typing import Optional, List
 import os
+import sys
 import asyncio
 import json
 import re
+import math
+import heapq
+import random
+import time
+import uuid
+import logging
+import contextvars
+import hashlib
+import sqlite3
+import unicodedata
+import gzip
+import base64
 from datetime import datetime, date
-from collections import defaultdict
-
-app = FastAPI(title="N2B Backend v3.1", description="키워드 + 지역 + 예상공고 + 데모모드")
+from collections import defaultdict, OrderedDict, Counter, deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, fields as dataclass_fields
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 시작/종료 시 공유 리소스 관리"""
+    open_upstream_clients()
+    await load_catalog_from_store()
+    await refresh_expected_index()
+    start_catalog_warmup()
+    start_health_prober()
+    yield
+    await stop_health_prober()
+    await stop_catalog_refresh()
+    await close_upstream_clients()
+    await close_llm_clients()
+
+app = FastAPI(title="N2B Backend v3.1", description="키워드 + 지역 + 예상공고 + 데모모드", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,8 +56,169 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After", "X-Request-ID"],
 )
 
+# ============================================
+# 로깅 (요청별 추적 ID 포함)
+# ============================================
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+trace_id_var = contextvars.ContextVar("trace_id", default="-")
+
+class TraceIdFilter(logging.Filter):
+    """로그 레코드에 현재 요청의 추적 ID를 붙임 (요청 밖의 백그라운드 작업은 "-")"""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id_var.get()
+        return True
+
+logger = logging.getLogger("n2b")
+if not logger.handlers:
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(trace_id)s] %(message)s"))
+    log_handler.addFilter(TraceIdFilter())
+    logger.addHandler(log_handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+# ============================================
+# 메트릭 (Prometheus 텍스트 형식, 워커 프로세스별 집계)
+# ============================================
+METRIC_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+class CounterMetric:
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values = defaultdict(float)
+        metrics_registry.append(self)
+    
+    def inc(self, *label_values, amount: float = 1.0):
+        self.values[label_values] += amount
+    
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{format_labels(self.labels, label_values)} {value:g}")
+        return lines
+
+class HistogramMetric:
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = METRIC_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}  # 레이블 값 -> [버킷별 개수..., 합계, 개수]
+        metrics_registry.append(self)
+    
+    def observe(self, value: float, *label_values):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+    
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = format_labels(self.labels + ("le",), label_values + (f"{bound:g}",))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.labels + ("le",), label_values + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            base = format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{base} {series[-2]:g}")
+            lines.append(f"{self.name}_count{base} {series[-1]}")
+        return lines
+
+metrics_registry = []
+metrics_collectors = []  # 기존 통계 dict를 수집 시점에 읽어 gauge/counter 줄로 변환하는 함수들
+
+http_requests = CounterMetric("n2b_http_requests_total", "HTTP 요청 수", ("method", "route", "status"))
+http_duration = HistogramMetric("n2b_http_request_duration_seconds", "HTTP 요청 처리 시간 (스트리밍은 전송 완료까지)", ("method", "route"))
+stage_duration = HistogramMetric("n2b_stage_duration_seconds", "파이프라인 단계별 소요 시간", ("stage",))
+upstream_requests = CounterMetric("n2b_upstream_requests_total", "업스트림 요청 수 (시도 단위)", ("upstream", "outcome"))
+upstream_duration = HistogramMetric("n2b_upstream_request_duration_seconds", "업스트림 요청 시간 (응답 파싱 포함)", ("upstream",))
+llm_requests = CounterMetric("n2b_llm_requests_total", "Claude 호출 수", ("mode", "outcome"))
+llm_tokens = CounterMetric("n2b_llm_tokens_total", "Claude 토큰 사용량", ("type",))
+llm_ttft = HistogramMetric("n2b_llm_time_to_first_token_seconds", "스트리밍 첫 토큰까지 시간")
+
+@contextmanager
+def observe_stage(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_duration.observe(time.perf_counter() - started, stage)
+
+def counter_lines(name: str, help_text: str, label: str, values: dict, metric_type: str = "counter") -> list:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for key, value in sorted(values.items()):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines.append(f"{name}{format_labels((label,), (key,))} {value:g}")
+    return lines
+
+def render_metrics() -> str:
+    lines = []
+    for metric in metrics_registry:
+        lines.extend(metric.render())
+    for collect in metrics_collectors:
+        try:
+            lines.extend(collect())
+        except Exception as e:
+            logger.warning(f"메트릭 수집 오류: {e}")
+    return "\n".join(lines) + "\n"
+
+def route_label(scope: dict) -> str:
+    """경로 대신 라우트 템플릿 (배치 ID 등으로 레이블이 늘어나지 않게)"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class RequestContextMiddleware:
+    """요청마다 추적 ID를 정하고(X-Request-ID가 오면 그대로 사용) 응답 헤더/로그/메트릭에 반영"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        headers = dict(scope.get("headers") or [])
+        trace_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex[:16]
+        token = trace_id_var.set(trace_id)
+        status = [500]
+        started = time.perf_counter()
+        
+        async def send_with_trace(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", trace_id.encode("latin-1"))]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            route = route_label(scope)
+            http_requests.inc(scope["method"], route, str(status[0]))
+            http_duration.observe(time.perf_counter() - started, scope["method"], route)
+            trace_id_var.reset(token)
+
+app.add_middleware(RequestContextMiddleware)
+
 # ============================================
 # API 키 설정 (환경변수)
 # ============================================
@@ -37,27 +229,572 @@ KSTARTUP_API_KEY = os.getenv("KSTARTUP_API_KEY", "47bd938c975a8989c5561a813fe66f
 DEMO_ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 
 # ============================================
-# 간단한 Rate Limiting (일일 요청 제한)
+# 업스트림 HTTP 클라이언트 (커넥션 풀 재사용)
+# ============================================
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "false").lower() == "true"
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "20"))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "10"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "5"))
+
+# 업스트림별 전체 타임아웃 (초)
+UPSTREAM_TIMEOUTS = {
+    "bizinfo": float(os.getenv("BIZINFO_TIMEOUT", "30")),
+    "kstartup": float(os.getenv("KSTARTUP_TIMEOUT", "30")),
+}
+
+upstream_clients = {}
+
+def http2_available() -> bool:
+    """HTTP/2는 h2 패키지가 있을 때만 사용 (pip install httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def create_upstream_client(name: str) -> httpx.AsyncClient:
+    timeout = UPSTREAM_TIMEOUTS[name]
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout, connect=min(timeout, UPSTREAM_CONNECT_TIMEOUT)),
+        limits=httpx.Limits(
+            max_connections=UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+            keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+        ),
+        http2=UPSTREAM_HTTP2 and http2_available(),
+    )
+
+def open_upstream_clients():
+    for name in UPSTREAM_TIMEOUTS:
+        get_upstream_client(name)
+
+def get_upstream_client(name: str) -> httpx.AsyncClient:
+    """업스트림별 공유 클라이언트 (lifespan 밖에서 호출되면 지연 생성)"""
+    client = upstream_clients.get(name)
+    if client is None or client.is_closed:
+        client = create_upstream_client(name)
+        upstream_clients[name] = client
+    return client
+
+async def close_upstream_clients():
+    clients = list(upstream_clients.values())
+    upstream_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+# ============================================
+# 동일 요청 병합 (single-flight)
 # ============================================
-daily_request_count = defaultdict(int)
-last_reset_date = date.today()
-MAX_DAILY_REQUESTS = 100  # 하루 최대 100회
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출은 진행 중인 하나의 작업 결과를 함께 받음"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.in_flight = {}
+        self.stats = defaultdict(int)
+    
+    async def run(self, key, func):
+        self.stats["calls"] += 1
+        task = self.in_flight.get(key)
+        if task is None:
+            self.stats["executions"] += 1
+            task = asyncio.ensure_future(func())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.stats["coalesced"] += 1
+        # 한 호출자가 취소돼도 공유 작업은 계속 진행
+        return await asyncio.shield(task)
+    
+    def _finish(self, key, task: asyncio.Future):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["errors"] += 1
+    
+    def status(self) -> dict:
+        return {
+            "calls": self.stats["calls"],
+            "executions": self.stats["executions"],
+            "coalesced": self.stats["coalesced"],
+            "errors": self.stats["errors"],
+            "in_flight": len(self.in_flight),
+        }
+
+upstream_flight = SingleFlight("upstream")
+llm_flight = SingleFlight("llm")
 
-def check_rate_limit() -> bool:
-    """일일 요청 제한 확인"""
-    global daily_request_count, last_reset_date
+# ============================================
+# 업스트림 보호 (서킷 브레이커 / 재시도 예산 / 헤지 요청)
+# ============================================
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))  # 연속 실패가 이 수에 닿으면 open
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))  # open 후 시험 호출까지 대기 (초)
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", "2"))
+UPSTREAM_RETRY_BASE_DELAY = float(os.getenv("UPSTREAM_RETRY_BASE_DELAY", "0.2"))
+UPSTREAM_RETRY_MAX_DELAY = float(os.getenv("UPSTREAM_RETRY_MAX_DELAY", "2"))
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))  # 최근 요청 대비 추가 요청(재시도+헤지) 비율 상한
+RETRY_BUDGET_MIN = int(os.getenv("RETRY_BUDGET_MIN", "5"))  # 요청이 적을 때도 허용할 추가 요청 수
+RETRY_BUDGET_WINDOW = float(os.getenv("RETRY_BUDGET_WINDOW", "10"))  # 예산 계산 구간 (초)
+UPSTREAM_HEDGE = os.getenv("UPSTREAM_HEDGE", "false").lower() == "true"
+UPSTREAM_HEDGE_MIN_DELAY = float(os.getenv("UPSTREAM_HEDGE_MIN_DELAY", "0.05"))
+UPSTREAM_HEDGE_MIN_SAMPLES = int(os.getenv("UPSTREAM_HEDGE_MIN_SAMPLES", "20"))  # p95를 믿을 수 있는 최소 표본 수
+UPSTREAM_LATENCY_WINDOW = int(os.getenv("UPSTREAM_LATENCY_WINDOW", "200"))
+
+class CircuitOpenError(Exception):
+    """브레이커가 열려 있어 업스트림을 호출하지 않음"""
+
+class CircuitBreaker:
+    """closed → (연속 실패) → open → (대기 후) half_open 시험 호출 1건 → closed 또는 다시 open"""
     
-    today = date.today()
-    if today != last_reset_date:
-        daily_request_count.clear()
-        last_reset_date = today
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.transitions = defaultdict(int)  # "closed->open" -> 횟수
+        self.rejected = 0
+        self.last_transition = None
+    
+    def _transition(self, state: str):
+        self.transitions[f"{self.state}->{state}"] += 1
+        logger.info(f"{self.name} 서킷 브레이커: {self.state} -> {state}")
+        self.state = state
+        self.last_transition = time.time()
+    
+    def before_call(self):
+        if self.state == "open" and time.monotonic() - self.opened_at >= BREAKER_RESET_TIMEOUT:
+            self._transition("half_open")
+        if self.state == "open" or (self.state == "half_open" and self.trial_in_flight):
+            self.rejected += 1
+            raise CircuitOpenError(f"{self.name} 서킷 브레이커 open - 호출 생략")
+        if self.state == "half_open":
+            self.trial_in_flight = True
+    
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.trial_in_flight = False
+        if self.state != "closed":
+            self._transition("closed")
+    
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.state == "half_open" or (self.state == "closed" and self.consecutive_failures >= BREAKER_FAILURE_THRESHOLD):
+            self.opened_at = time.monotonic()
+            self._transition("open")
+    
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+            "last_transition": datetime.fromtimestamp(self.last_transition).isoformat() if self.last_transition else None,
+        }
+
+class RetryBudget:
+    """최근 RETRY_BUDGET_WINDOW초 동안의 원 요청 수에 비례해 재시도/헤지 허용 (업스트림 장애 시 부하 증폭 방지)"""
+    
+    def __init__(self):
+        self.requests = deque()
+        self.extras = deque()
+        self.stats = defaultdict(int)
+    
+    def _trim(self, now: float):
+        for events in (self.requests, self.extras):
+            while events and now - events[0] > RETRY_BUDGET_WINDOW:
+                events.popleft()
+    
+    def record_request(self):
+        self.requests.append(time.monotonic())
+    
+    def try_acquire(self, kind: str) -> bool:
+        now = time.monotonic()
+        self._trim(now)
+        if len(self.extras) >= max(RETRY_BUDGET_MIN, RETRY_BUDGET_RATIO * len(self.requests)):
+            self.stats[f"{kind}_denied"] += 1
+            return False
+        self.extras.append(now)
+        self.stats[kind] += 1
+        return True
+    
+    def status(self) -> dict:
+        self._trim(time.monotonic())
+        return {"window_requests": len(self.requests), "window_extras": len(self.extras), **self.stats}
+
+upstream_breakers = {name: CircuitBreaker(name) for name in ("bizinfo", "kstartup")}
+upstream_latencies = {name: deque(maxlen=UPSTREAM_LATENCY_WINDOW) for name in upstream_breakers}
+retry_budget = RetryBudget()
+
+def is_retryable_error(error: Exception) -> bool:
+    """네트워크/타임아웃 오류와 5xx, 429만 재시도 (그 외 4xx는 다시 보내도 같음)"""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, (httpx.TransportError, ET.ParseError))
+
+def latency_p95(name: str) -> Optional[float]:
+    samples = upstream_latencies[name]
+    if len(samples) < UPSTREAM_HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+def upstream_outcome(error: Optional[Exception]) -> str:
+    """메트릭 레이블용 결과 분류 (HTTP 오류는 상태 코드별)"""
+    if error is None:
+        return "ok"
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"http_{error.response.status_code}"
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "transport"
+    if isinstance(error, ET.ParseError):
+        return "parse"
+    return "error"
+
+async def timed_attempt(name: str, func):
+    started = time.monotonic()
+    try:
+        result = await func()
+    except asyncio.CancelledError:
+        upstream_requests.inc(name, "cancelled")
+        raise
+    except Exception as e:
+        upstream_requests.inc(name, upstream_outcome(e))
+        upstream_duration.observe(time.monotonic() - started, name)
+        raise
+    elapsed = time.monotonic() - started
+    upstream_latencies[name].append(elapsed)
+    upstream_requests.inc(name, "ok")
+    upstream_duration.observe(elapsed, name)
+    return result
+
+async def hedged_attempt(name: str, func):
+    """p95 시간이 지나도 응답이 없으면 같은 요청을 하나 더 보내고 먼저 성공한 쪽을 사용"""
+    delay = latency_p95(name) if UPSTREAM_HEDGE else None
+    if delay is None:
+        return await timed_attempt(name, func)
+    
+    tasks = [asyncio.ensure_future(timed_attempt(name, func))]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=max(delay, UPSTREAM_HEDGE_MIN_DELAY))
+        if done or not retry_budget.try_acquire("hedges"):
+            return await tasks[0]
+        
+        tasks.append(asyncio.ensure_future(timed_attempt(name, func)))
+        pending, first_error = set(tasks), None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                first_error = first_error or task.exception()
+        raise first_error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+async def call_upstream(name: str, func):
+    """업스트림 한 건 호출 - 브레이커 확인, 지터 백오프 재시도(예산 안에서), 선택적 헤지"""
+    breaker = upstream_breakers[name]
+    retry_budget.record_request()
+    attempt = 0
+    while True:
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            upstream_requests.inc(name, "circuit_open")
+            raise
+        try:
+            result = await hedged_attempt(name, func)
+        except asyncio.CancelledError:
+            breaker.trial_in_flight = False
+            raise
+        except Exception as e:
+            retryable = is_retryable_error(e)
+            if retryable:
+                breaker.record_failure()
+            else:
+                breaker.trial_in_flight = False
+            if not retryable or attempt >= UPSTREAM_RETRIES or breaker.state != "closed" or not retry_budget.try_acquire("retries"):
+                raise
+            attempt += 1
+            # full jitter: 0 ~ base * 2^attempt 사이에서 무작위 대기
+            await asyncio.sleep(random.uniform(0, min(UPSTREAM_RETRY_MAX_DELAY, UPSTREAM_RETRY_BASE_DELAY * 2 ** attempt)))
+            continue
+        breaker.record_success()
+        return result
+
+def get_upstream_resilience_status() -> dict:
+    result = {}
+    for name, breaker in upstream_breakers.items():
+        p95 = latency_p95(name)
+        result[name] = {**breaker.status(), "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None}
+    return {"upstreams": result, "retry_budget": retry_budget.status(), "hedging": UPSTREAM_HEDGE}
+
+# ============================================
+# Claude 클라이언트 (API 키별 재사용 + 동시 호출 제한)
+# ============================================
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # 동시에 진행할 Claude 호출 수
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "60"))  # 대기열에서 기다릴 최대 시간 (초)
+LLM_CLIENT_CACHE_SIZE = int(os.getenv("LLM_CLIENT_CACHE_SIZE", "32"))  # 재사용할 API 키별 클라이언트 수
+
+llm_clients = OrderedDict()  # api_key -> AsyncAnthropic (LRU)
+llm_http_client = None      # 모든 키의 클라이언트가 공유하는 연결 풀
+llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+llm_stats = defaultdict(int)
+
+def get_llm_client(api_key: str) -> anthropic.AsyncAnthropic:
+    """키별 클라이언트는 인증 헤더만 다르고 연결 풀은 공유 - LRU에서 밀려나도 닫을 자원이 없음"""
+    global llm_http_client
+    client = llm_clients.get(api_key)
+    if client is None:
+        if llm_http_client is None:
+            llm_http_client = anthropic.DefaultAsyncHttpxClient()
+        client = anthropic.AsyncAnthropic(api_key=api_key, http_client=llm_http_client)
+        llm_clients[api_key] = client
+        if len(llm_clients) > LLM_CLIENT_CACHE_SIZE:
+            # 진행 중인 요청이 있을 수 있으므로 닫지 않고 참조만 해제 (공유 풀은 그대로 사용)
+            llm_clients.popitem(last=False)
+    else:
+        llm_clients.move_to_end(api_key)
+    return client
+
+async def close_llm_clients():
+    """공유 연결 풀을 한 번만 닫음 (AsyncAnthropic.close()는 넘겨받은 http_client를 닫으므로 호출하지 않음)"""
+    global llm_http_client
+    llm_clients.clear()
+    if llm_http_client is not None:
+        http_client, llm_http_client = llm_http_client, None
+        await http_client.aclose()
+
+@asynccontextmanager
+async def llm_slot():
+    """동시 호출 수 제한 - 자리가 없으면 대기하고, 너무 오래 기다리면 503"""
+    llm_stats["waiting"] += 1
+    try:
+        await asyncio.wait_for(llm_semaphore.acquire(), LLM_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        llm_stats["rejected"] += 1
+        raise HTTPException(status_code=503, detail="요청이 많아 처리가 지연되고 있습니다. 잠시 후 다시 시도해주세요.")
+    finally:
+        llm_stats["waiting"] -= 1
+    
+    llm_stats["in_flight"] += 1
+    try:
+        yield
+    finally:
+        llm_stats["in_flight"] -= 1
+        llm_semaphore.release()
+
+def record_llm_usage(message):
+    usage = getattr(message, "usage", None)
+    if usage is None:
+        return
+    for kind in ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"):
+        value = getattr(usage, kind, None)
+        if value:
+            llm_tokens.inc(kind.replace("_tokens", ""), amount=value)
+
+def llm_outcome(error: Exception) -> str:
+    if isinstance(error, anthropic.APIStatusError):
+        return f"http_{error.status_code}"
+    if isinstance(error, anthropic.APITimeoutError):
+        return "timeout"
+    if isinstance(error, anthropic.APIConnectionError):
+        return "connection"
+    return "error"
+
+async def create_message(api_key: str, **kwargs):
+    """비동기 Claude 호출 (이벤트 루프를 막지 않음)
+
+    같은 키·같은 프롬프트로 동시에 들어온 호출은 한 번만 실행
+    """
+    async def call():
+        async with llm_slot():
+            started = time.perf_counter()
+            try:
+                message = await get_llm_client(api_key).messages.create(**kwargs)
+            except Exception as e:
+                llm_requests.inc("create", llm_outcome(e))
+                raise
+            finally:
+                stage_duration.observe(time.perf_counter() - started, "llm_call")
+            llm_requests.inc("create", "ok")
+            record_llm_usage(message)
+            return message
+    
+    request_hash = hashlib.sha256(
+        json.dumps([api_key, kwargs], ensure_ascii=False, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return await llm_flight.run(request_hash, call)
+
+# ============================================
+# Rate Limiting (워커 간 공유 - 클라이언트별 토큰 버킷 + 전체 일일 한도)
+# ============================================
+MAX_DAILY_REQUESTS = int(os.getenv("MAX_DAILY_REQUESTS", "100"))  # 전체 하루 최대 100회
+RATE_LIMIT_CLIENT_BURST = int(os.getenv("RATE_LIMIT_CLIENT_BURST", "10"))  # 클라이언트별 연속 요청 허용 수
+RATE_LIMIT_CLIENT_REFILL_PER_HOUR = float(os.getenv("RATE_LIMIT_CLIENT_REFILL_PER_HOUR", "10"))  # 시간당 회복량
+# 앞단 프록시 수 - X-Forwarded-For 끝에서 이만큼 앞의 주소를 클라이언트로 사용 (0이면 헤더 무시)
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+# 다른 워커가 잠금을 잡고 있을 때 기다릴 최대 시간 (이벤트 루프에서 실행되므로 짧게)
+RATE_LIMIT_BUSY_TIMEOUT = float(os.getenv("RATE_LIMIT_BUSY_TIMEOUT", "0.1"))
+# 여러 uvicorn 워커가 같은 파일을 공유 (빈 값이면 프로세스 내 메모리)
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", "n2b_ratelimit.db")
+
+RATE_LIMIT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    client TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rate_daily (
+    day TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+rate_limit_conn = None
+rate_limit_stats = defaultdict(int)
+
+def get_rate_limit_conn() -> sqlite3.Connection:
+    """프로세스당 연결 하나를 재사용 (이벤트 루프 스레드에서만 사용)"""
+    global rate_limit_conn
+    if rate_limit_conn is None:
+        conn = sqlite3.connect(RATE_LIMIT_DB_PATH or ":memory:", timeout=RATE_LIMIT_BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        if RATE_LIMIT_DB_PATH:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(RATE_LIMIT_SCHEMA)
+        rate_limit_conn = conn
+    return rate_limit_conn
+
+def seconds_until_midnight() -> int:
+    now = datetime.now()
+    midnight = datetime.combine(now.date(), datetime.min.time()).timestamp() + 86400
+    return max(1, int(midnight - now.timestamp()))
+
+def check_rate_limit(client: str = "anonymous") -> dict:
+    """전체 일일 한도와 클라이언트 버킷을 한 트랜잭션에서 확인 후 차감"""
+    refill_per_sec = RATE_LIMIT_CLIENT_REFILL_PER_HOUR / 3600
+    today = date.today().isoformat()
+    now = time.time()
+    conn = get_rate_limit_conn()
+    
+    # BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡아 워커 간 확인·차감을 원자적으로 처리
+    # 잠금을 RATE_LIMIT_BUSY_TIMEOUT 안에 못 잡으면 루프를 오래 막지 않고 503
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+    except sqlite3.OperationalError:
+        rate_limit_stats["busy"] += 1
+        raise HTTPException(status_code=503, detail="요청이 많아 처리가 지연되고 있습니다. 잠시 후 다시 시도해주세요.",
+                            headers={"Retry-After": "1"})
+    try:
+        row = conn.execute("SELECT count FROM rate_daily WHERE day = ?", (today,)).fetchone()
+        if row is None:
+            # 날짜가 바뀌면 지난 기록과 오래된 버킷 정리
+            conn.execute("DELETE FROM rate_daily WHERE day <> ?", (today,))
+            conn.execute("DELETE FROM rate_buckets WHERE updated_at < ?", (now - 86400,))
+        used = row[0] if row else 0
+        
+        bucket = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE client = ?", (client,)).fetchone()
+        tokens = RATE_LIMIT_CLIENT_BURST
+        if bucket:
+            tokens = min(RATE_LIMIT_CLIENT_BURST, bucket[0] + (now - bucket[1]) * refill_per_sec)
+        
+        if used >= MAX_DAILY_REQUESTS:
+            allowed, scope = False, "global"
+        elif tokens < 1:
+            allowed, scope = False, "client"
+        else:
+            allowed, scope = True, None
+            tokens -= 1
+            used += 1
+            conn.execute(
+                "INSERT INTO rate_daily (day, count) VALUES (?, ?) ON CONFLICT(day) DO UPDATE SET count = excluded.count",
+                (today, used),
+            )
+            conn.execute(
+                "INSERT INTO rate_buckets (client, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(client) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (client, tokens, now),
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    
+    rate_limit_stats["allowed" if allowed else f"rejected_{scope}"] += 1
+    client_remaining = int(tokens)
+    global_remaining = MAX_DAILY_REQUESTS - used
+    client_reset = math.ceil((RATE_LIMIT_CLIENT_BURST - tokens) / refill_per_sec) if refill_per_sec > 0 else seconds_until_midnight()
+    
+    # 헤더에는 더 먼저 소진되는 쪽 기준으로 표시
+    if scope == "global" or (scope is None and global_remaining <= client_remaining):
+        limit, remaining, reset = MAX_DAILY_REQUESTS, global_remaining, seconds_until_midnight()
+    else:
+        limit, remaining, reset = RATE_LIMIT_CLIENT_BURST, client_remaining, client_reset
     
-    daily_request_count["total"] += 1
-    return daily_request_count["total"] <= MAX_DAILY_REQUESTS
+    retry_after = None
+    if scope == "global":
+        retry_after = seconds_until_midnight()
+    elif scope == "client":
+        retry_after = math.ceil((1 - tokens) / refill_per_sec) if refill_per_sec > 0 else seconds_until_midnight()
+    
+    return {
+        "allowed": allowed,
+        "scope": scope,
+        "limit": limit,
+        "remaining": max(0, remaining),
+        "reset": reset,
+        "retry_after": retry_after,
+    }
 
 def get_remaining_requests() -> int:
-    """남은 요청 횟수"""
-    return max(0, MAX_DAILY_REQUESTS - daily_request_count.get("total", 0))
+    """남은 요청 횟수 (전체 일일 한도 기준)"""
+    row = get_rate_limit_conn().execute("SELECT count FROM rate_daily WHERE day = ?", (date.today().isoformat(),)).fetchone()
+    return max(0, MAX_DAILY_REQUESTS - (row[0] if row else 0))
+
+def get_client_id(request: Request) -> str:
+    """프록시(Render) 뒤의 실제 클라이언트 주소
+
+    X-Forwarded-For의 앞부분은 클라이언트가 임의로 넣을 수 있으므로, 신뢰하는 프록시가
+    끝에 덧붙인 주소(끝에서 TRUSTED_PROXY_HOPS번째)만 사용
+    """
+    forwarded = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    if TRUSTED_PROXY_HOPS > 0 and len(forwarded) >= TRUSTED_PROXY_HOPS:
+        return forwarded[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "anonymous"
+
+def rate_limit_headers(result: dict) -> dict:
+    headers = {
+        "X-RateLimit-Limit": str(result["limit"]),
+        "X-RateLimit-Remaining": str(result["remaining"]),
+        "X-RateLimit-Reset": str(result["reset"]),
+    }
+    if result["retry_after"] is not None:
+        headers["Retry-After"] = str(result["retry_after"])
+    return headers
+
+def enforce_rate_limit(request: Request, response: Optional[Response] = None) -> dict:
+    """한도 초과면 429, 통과하면 응답에 rate-limit 헤더를 붙이고 헤더 반환"""
+    result = check_rate_limit(get_client_id(request))
+    headers = rate_limit_headers(result)
+    if not result["allowed"]:
+        if result["scope"] == "global":
+            detail = f"일일 요청 한도 초과 (최대 {MAX_DAILY_REQUESTS}회)"
+        else:
+            detail = f"요청이 너무 잦습니다. {result['retry_after']}초 후 다시 시도해주세요."
+        raise HTTPException(status_code=429, detail=detail, headers=headers)
+    if response is not None:
+        response.headers.update(headers)
+    return headers
 
 # ============================================
 # 반복 사업 패턴 (예상 공고용)
@@ -162,6 +899,20 @@ class MatchRequest(BaseModel):
     region: str = "전체"
     useRealtime: bool = True
 
+class BatchAnalyzeRequest(BaseModel):
+    apiKey: str
+    proposalTexts: List[str]
+    concurrency: Optional[int] = None
+    mode: str = "realtime"  # realtime: 바로 분석 후 스트리밍, offline: Message Batches API로 제출
+
+class BatchResultsRequest(BaseModel):
+    apiKey: str
+
+class RankRequest(BaseModel):
+    n2bAnalysis: dict
+    region: str = "전체"
+    topK: int = 20
+
 # 데모용 요청 모델 (API 키 불필요)
 class DemoAnalyzeRequest(BaseModel):
     proposalText: str
@@ -176,70 +927,206 @@ class DemoPptRequest(BaseModel):
     n2bResult: dict
     selectedProgram: dict
 
+# ============================================
+# 지원사업 레코드
+# ============================================
+@dataclass(slots=True)
+class Program:
+    """수집부터 필터링/응답까지 쓰는 지원사업 레코드 (dict보다 레코드당 메모리가 작음)
+
+    기존 코드와 응답 형식을 위해 dict처럼 p["name"], p.get(...), {**p} 로도 읽을 수 있음.
+    값이 None인 필드는 없는 키로 취급 (JSON에도 나오지 않음)
+    """
+    id: str = ""
+    name: str = ""
+    agency: str = ""
+    target: str = ""
+    period: str = ""
+    support_amount: str = ""
+    url: str = ""
+    region: str = ""
+    recruiting: Optional[str] = None  # K-Startup만
+    source: str = ""
+    sources: Optional[list] = None  # 중복 병합된 레코드만
+    urls: Optional[list] = None
+    merged_ids: Optional[list] = None
+    
+    def get(self, key: str, default=None):
+        value = getattr(self, key, None) if key in PROGRAM_FIELDS else None
+        return default if value is None else value
+    
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+    
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+    
+    def keys(self) -> list:
+        return [f for f in PROGRAM_FIELDS if getattr(self, f) is not None]
+    
+    def items(self) -> list:
+        return [(f, getattr(self, f)) for f in self.keys()]
+    
+    def to_dict(self) -> dict:
+        return {f: getattr(self, f) for f in self.keys()}
+    
+    @classmethod
+    def from_dict(cls, data) -> "Program":
+        return cls(**{k: v for k, v in data.items() if k in PROGRAM_FIELDS})
+
+PROGRAM_FIELDS = tuple(f.name for f in dataclass_fields(Program))
+
+def to_json_value(value):
+    """orjson이 직접 처리하지 못하는 값 변환 (Program은 None 필드를 빼고 dict로)"""
+    if isinstance(value, Program):
+        return value.to_dict()
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"JSON 직렬화 불가: {type(value).__name__}")
+
+def dump_json(content) -> bytes:
+    return orjson.dumps(content, default=to_json_value, option=orjson.OPT_PASSTHROUGH_DATACLASS)
+
+class FastJSONResponse(JSONResponse):
+    """orjson 직렬화 응답 - jsonable_encoder를 거치지 않도록 핸들러에서 직접 반환"""
+    def render(self, content) -> bytes:
+        return dump_json(content)
+
 # ============================================
 # 기업마당 API
 # ============================================
+BIZINFO_URL = os.getenv("BIZINFO_URL", "https://www.bizinfo.go.kr/uss/rss/bizinfoApi.do")
+
+def parse_bizinfo_item(item) -> Program:
+    pblanc_id = item.findtext("pblancId", "")
+    # 기관명/지역처럼 반복되는 값은 intern으로 한 객체만 유지
+    return Program(
+        id=pblanc_id,
+        name=item.findtext("pblancNm", ""),
+        agency=sys.intern(item.findtext("jrsdInsttNm", "")),
+        target=item.findtext("trgetNm", ""),
+        period=item.findtext("reqstBeginEndDe", ""),
+        support_amount=item.findtext("sprtCn", ""),
+        url=f"https://www.bizinfo.go.kr/web/lay1/bbs/S1T122C128/AS/74/view.do?pblancId={pblanc_id}" if pblanc_id else "",
+        region=sys.intern(item.findtext("jrsdInsttNm", "전국")),
+        source="기업마당"
+    )
+
+async def iter_bizinfo_programs(params: dict, meta: Optional[dict] = None):
+    """기업마당 응답을 청크 단위로 파싱하며 <item>마다 지원사업을 바로 yield
+
+    응답 전체를 문자열/트리로 올리지 않고, 변환이 끝난 <item>은 트리에서 제거.
+    meta를 넘기면 첫 항목의 전체 건수(totCnt)를 meta["total"]에 기록.
+    """
+    client = get_upstream_client("bizinfo")
+    async with client.stream("GET", BIZINFO_URL, params={"crtfcKey": BIZINFO_API_KEY, "dataType": "xml", **params}) as response:
+        response.raise_for_status()
+        
+        parser = ET.XMLPullParser(events=("start", "end"))
+        stack = []
+        parse_seconds = 0.0  # 수신 대기를 뺀 파싱 시간만 누적 (yield 이후 소비자 시간도 제외)
+        try:
+            async for chunk in response.aiter_bytes():
+                started = time.perf_counter()
+                parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    if event == "start":
+                        stack.append(elem)
+                        continue
+                    stack.pop()
+                    if elem.tag != "item":
+                        continue
+                    
+                    if meta is not None and "total" not in meta:
+                        try:
+                            meta["total"] = int(elem.findtext("totCnt", "") or 0) or None
+                        except ValueError:
+                            meta["total"] = None
+                    program = parse_bizinfo_item(elem)
+                    elem.clear()
+                    if stack:
+                        stack[-1].remove(elem)
+                    parse_seconds += time.perf_counter() - started
+                    yield program
+                    started = time.perf_counter()
+                parse_seconds += time.perf_counter() - started
+            started = time.perf_counter()
+            parser.close()
+            parse_seconds += time.perf_counter() - started
+        finally:
+            stage_duration.observe(parse_seconds, "bizinfo_parse")
+
+async def fetch_bizinfo_page(params: dict) -> tuple:
+    """기업마당 한 번 호출 → (지원사업 목록, 전체 건수). 오류는 호출자에게 전달
+
+    같은 파라미터로 동시에 들어온 호출은 한 번만 요청 (결과 목록은 공유되므로 수정 금지)
+    """
+    async def fetch():
+        meta = {}
+        programs = [program async for program in iter_bizinfo_programs(params, meta)]
+        return programs, meta.get("total") or len(programs)
+    
+    return await upstream_flight.run(("bizinfo", tuple(sorted(params.items()))), lambda: call_upstream("bizinfo", fetch))
+
 async def fetch_bizinfo_programs(keyword: Optional[str] = None, count: int = 100) -> list:
     """기업마당에서 지원사업 목록 조회"""
-    url = "https://www.bizinfo.go.kr/uss/rss/bizinfoApi.do"
-    
-    params = {
-        "crtfcKey": BIZINFO_API_KEY,
-        "dataType": "xml",
-        "searchCnt": count,
-    }
-    
+    params = {}
     if keyword:
         params["searchKind"] = keyword
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            
-            root = ET.fromstring(response.text)
-            programs = []
-            
-            for item in root.findall(".//item"):
-                pblanc_id = item.findtext("pblancId", "")
-                program = {
-                    "id": pblanc_id,
-                    "name": item.findtext("pblancNm", ""),
-                    "agency": item.findtext("jrsdInsttNm", ""),
-                    "target": item.findtext("trgetNm", ""),
-                    "period": item.findtext("reqstBeginEndDe", ""),
-                    "support_amount": item.findtext("sprtCn", ""),
-                    "url": f"https://www.bizinfo.go.kr/web/lay1/bbs/S1T122C128/AS/74/view.do?pblancId={pblanc_id}" if pblanc_id else "",
-                    "region": item.findtext("jrsdInsttNm", "전국"),
-                    "source": "기업마당"
-                }
-                programs.append(program)
-            
+        if count > CRAWL_PAGE_SIZE:
+            # 큰 searchCnt는 한 번에 받지 않고 페이지로 나눠 병렬 수집
+            programs, _ = await crawl_bizinfo_catalog(keyword, max_items=count)
             return programs
-            
+        
+        programs, _ = await fetch_bizinfo_page({**params, "searchCnt": count})
+        return programs
+        
     except Exception as e:
-        print(f"기업마당 API 오류: {e}")
+        logger.warning(f"기업마당 API 오류: {e}")
         return []
 
 # ============================================
 # K-Startup API
 # ============================================
-async def fetch_kstartup_programs(keyword: Optional[str] = None, page: int = 1, per_page: int = 100) -> list:
-    """K-Startup에서 창업지원사업 목록 조회"""
-    url = "https://apis.data.go.kr/B552735/kisedKstartupService01/getAnnouncementInformation01"
-    
-    params = {
-        "ServiceKey": KSTARTUP_API_KEY,
-        "page": page,
-        "perPage": per_page,
-        "returnType": "json"
-    }
-    
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            
+KSTARTUP_URL = os.getenv("KSTARTUP_URL", "https://apis.data.go.kr/B552735/kisedKstartupService01/getAnnouncementInformation01")
+
+def parse_kstartup_item(item: dict) -> Program:
+    return Program(
+        id=str(item.get("pbanc_sn", "")),
+        name=item.get("biz_pbanc_nm", ""),
+        agency=sys.intern(item.get("excins_nm", "창업진흥원") or ""),
+        target=item.get("aply_trgt_ctnt", item.get("aply_trgt", "")),
+        period=f"{item.get('pbanc_rcpt_bgng_dt', '')} ~ {item.get('pbanc_rcpt_end_dt', '')}",
+        support_amount=sys.intern(item.get("supt_biz_clsfc", "") or ""),
+        url=item.get("detl_pg_url", ""),
+        region=sys.intern(item.get("supt_regin", "전국") or ""),
+        recruiting=item.get("rcrt_prgs_yn", ""),
+        source="K-Startup"
+    )
+
+async def fetch_kstartup_page(page: int, per_page: int) -> tuple:
+    """K-Startup 한 페이지 호출 → (지원사업 목록, 전체 건수). 오류는 호출자에게 전달
+
+    같은 페이지를 동시에 요청하면 한 번만 호출 (결과 목록은 공유되므로 수정 금지)
+    """
+    async def fetch():
+        params = {
+            "ServiceKey": KSTARTUP_API_KEY,
+            "page": page,
+            "perPage": per_page,
+            "returnType": "json"
+        }
+        
+        client = get_upstream_client("kstartup")
+        response = await client.get(KSTARTUP_URL, params=params)
+        response.raise_for_status()
+        
+        with observe_stage("kstartup_parse"):
             data = response.json()
             
             items = data.get("data", [])
@@ -248,27 +1135,487 @@ async def fetch_kstartup_programs(keyword: Optional[str] = None, page: int = 1,
             if items is None:
                 items = []
             
-            programs = []
-            for item in items:
-                program = {
-                    "id": str(item.get("pbanc_sn", "")),
-                    "name": item.get("biz_pbanc_nm", ""),
-                    "agency": item.get("excins_nm", "창업진흥원"),
-                    "target": item.get("aply_trgt_ctnt", item.get("aply_trgt", "")),
-                    "period": f"{item.get('pbanc_rcpt_bgng_dt', '')} ~ {item.get('pbanc_rcpt_end_dt', '')}",
-                    "support_amount": item.get("supt_biz_clsfc", ""),
-                    "url": item.get("detl_pg_url", ""),
-                    "region": item.get("supt_regin", "전국"),
-                    "recruiting": item.get("rcrt_prgs_yn", ""),
-                    "source": "K-Startup"
-                }
-                programs.append(program)
-            
+            programs = [parse_kstartup_item(item) for item in items]
+        total = data.get("totalCount") or data.get("matchCount") or len(programs)
+        return programs, int(total)
+        
+    return await upstream_flight.run(("kstartup", page, per_page), lambda: call_upstream("kstartup", fetch))
+
+async def fetch_kstartup_programs(keyword: Optional[str] = None, page: int = 1, per_page: int = 100) -> list:
+    """K-Startup에서 창업지원사업 목록 조회"""
+    try:
+        programs, _ = await fetch_kstartup_page(page, per_page)
+        return programs
+        
+    except Exception as e:
+        logger.warning(f"K-Startup API 오류: {e}")
+        return []
+
+# ============================================
+# 전체 카탈로그 크롤러 (페이지 병렬 수집)
+# ============================================
+CATALOG_FULL_CRAWL = os.getenv("CATALOG_FULL_CRAWL", "true").lower() == "true"
+CRAWL_PAGE_SIZE = int(os.getenv("CRAWL_PAGE_SIZE", "100"))
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "50"))
+CRAWL_MAX_PAGES_PER_SEC = float(os.getenv("CRAWL_MAX_PAGES_PER_SEC", "0"))  # 0이면 속도 제한 없음
+
+crawl_reports = {}  # source -> 마지막 크롤 결과 (페이지 수, 처리량 등)
+
+async def crawl_pages(source: str, fetch_page, page_size: int, max_items: Optional[int] = None) -> tuple:
+    """첫 페이지에서 전체 건수를 읽고 나머지 페이지를 동시 수집 → (목록, 누락 없이 수집했는지)"""
+    started = time.perf_counter()
+    # 페이지별 재시도는 call_upstream의 재시도 예산 안에서 처리
+    first_programs, total = await fetch_page(1)
+    if max_items is not None:
+        total = min(total, max_items)
+    
+    page_count = min(max(1, -(-total // page_size)), CRAWL_MAX_PAGES)
+    semaphore = asyncio.Semaphore(CRAWL_CONCURRENCY)
+    interval = 1.0 / CRAWL_MAX_PAGES_PER_SEC if CRAWL_MAX_PAGES_PER_SEC > 0 else 0.0
+    next_slot = [time.monotonic()]
+    
+    async def run(page: int):
+        async with semaphore:
+            if interval:
+                now = time.monotonic()
+                slot = max(now, next_slot[0])
+                next_slot[0] = slot + interval
+                await asyncio.sleep(slot - now)
+            programs, _ = await fetch_page(page)
             return programs
+    
+    results = await asyncio.gather(*(run(page) for page in range(2, page_count + 1)), return_exceptions=True)
+    
+    programs = list(first_programs)
+    failed_pages = 0
+    for result in results:
+        if isinstance(result, BaseException):
+            failed_pages += 1
+            logger.warning(f"{source} 페이지 수집 실패: {result}")
+        else:
+            programs.extend(result)
+    if max_items is not None:
+        programs = programs[:max_items]
+    
+    elapsed = time.perf_counter() - started
+    crawl_reports[source] = {
+        "total": total,
+        "pages": page_count,
+        "failed_pages": failed_pages,
+        "items": len(programs),
+        "truncated": page_count * page_size < total,
+        "concurrency": CRAWL_CONCURRENCY,
+        "elapsed_seconds": round(elapsed, 3),
+        "pages_per_sec": round(page_count / elapsed, 2) if elapsed > 0 else None,
+        "finished_at": datetime.now().isoformat(),
+    }
+    return programs, failed_pages == 0 and not crawl_reports[source]["truncated"]
+
+async def crawl_bizinfo_catalog(keyword: Optional[str] = None, max_items: Optional[int] = None) -> tuple:
+    params = {"searchKind": keyword} if keyword else {}
+    
+    async def fetch_page(page: int):
+        return await fetch_bizinfo_page({**params, "pageUnit": CRAWL_PAGE_SIZE, "pageIndex": page})
+    
+    return await crawl_pages("bizinfo", fetch_page, CRAWL_PAGE_SIZE, max_items)
+
+async def crawl_kstartup_catalog() -> tuple:
+    async def fetch_page(page: int):
+        return await fetch_kstartup_page(page, CRAWL_PAGE_SIZE)
+    
+    return await crawl_pages("kstartup", fetch_page, CRAWL_PAGE_SIZE)
+
+async def fetch_catalog_bizinfo() -> tuple:
+    """카탈로그 갱신용 기업마당 전체 목록 → (목록, 완전한 목록인지)"""
+    if not CATALOG_FULL_CRAWL:
+        return await fetch_bizinfo_programs(), False
+    try:
+        return await crawl_bizinfo_catalog()
+    except Exception as e:
+        logger.warning(f"기업마당 크롤 오류: {e}")
+        return [], False
+
+async def fetch_catalog_kstartup() -> tuple:
+    """카탈로그 갱신용 K-Startup 전체 목록 → (목록, 완전한 목록인지)"""
+    if not CATALOG_FULL_CRAWL:
+        return await fetch_kstartup_programs(), False
+    try:
+        return await crawl_kstartup_catalog()
+    except Exception as e:
+        logger.warning(f"K-Startup 크롤 오류: {e}")
+        return [], False
+
+# ============================================
+# 로컬 지원사업 저장소 (SQLite, 재시작 시 웜스타트)
+# ============================================
+PROGRAM_DB_PATH = os.getenv("PROGRAM_DB_PATH", "n2b_programs.db")  # 빈 값이면 저장하지 않음
+
+PROGRAM_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS programs (
+    source TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'open',
+    position INTEGER NOT NULL DEFAULT 0,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source, id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    source TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL
+);
+"""
+
+def open_program_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(PROGRAM_DB_PATH, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(PROGRAM_DB_SCHEMA)
+    return conn
+
+def program_key(program: dict) -> str:
+    """pblancId / pbanc_sn 기준 키 (ID가 없으면 사업명 해시)"""
+    if program.get("id"):
+        return program["id"]
+    return "name:" + hashlib.sha1(program.get("name", "").encode()).hexdigest()
+
+def sync_programs(source: str, programs: list, synced_at: float, complete: bool = True) -> dict:
+    """변경된 행만 upsert하고, 목록에서 사라진 공고는 closed로 표시
+
+    일부 페이지만 받은 경우(complete=False)에는 사라진 공고를 닫지 않음
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "closed": 0}
+    conn = open_program_db()
+    try:
+        with conn:
+            existing = {
+                row[0]: (row[1], row[2])
+                for row in conn.execute("SELECT id, content_hash, status FROM programs WHERE source = ?", (source,))
+            }
+            seen = set()
+            for position, program in enumerate(programs):
+                key = program_key(program)
+                if key in seen:
+                    continue
+                seen.add(key)
+                data = json.dumps(dict(program), ensure_ascii=False, sort_keys=True)
+                content_hash = hashlib.sha1(data.encode()).hexdigest()
+                
+                if key not in existing:
+                    conn.execute(
+                        "INSERT INTO programs (source, id, data, content_hash, status, position, first_seen, last_seen, updated_at) "
+                        "VALUES (?, ?, ?, ?, 'open', ?, ?, ?, ?)",
+                        (source, key, data, content_hash, position, synced_at, synced_at, synced_at),
+                    )
+                    counts["inserted"] += 1
+                elif existing[key] != (content_hash, "open"):
+                    conn.execute(
+                        "UPDATE programs SET data = ?, content_hash = ?, status = 'open', position = ?, last_seen = ?, updated_at = ? "
+                        "WHERE source = ? AND id = ?",
+                        (data, content_hash, position, synced_at, synced_at, source, key),
+                    )
+                    counts["updated"] += 1
+                else:
+                    conn.execute(
+                        "UPDATE programs SET position = ?, last_seen = ? WHERE source = ? AND id = ?",
+                        (position, synced_at, source, key),
+                    )
+                    counts["unchanged"] += 1
             
+            vanished = []
+            if complete:
+                vanished = [key for key, (_, status) in existing.items() if status == "open" and key not in seen]
+            conn.executemany(
+                "UPDATE programs SET status = 'closed', updated_at = ? WHERE source = ? AND id = ?",
+                [(synced_at, source, key) for key in vanished],
+            )
+            counts["closed"] = len(vanished)
+            
+            conn.execute(
+                "INSERT INTO sync_state (source, synced_at) VALUES (?, ?) "
+                "ON CONFLICT(source) DO UPDATE SET synced_at = excluded.synced_at",
+                (source, synced_at),
+            )
+    finally:
+        conn.close()
+    return counts
+
+def load_program_history() -> list:
+    """지금까지 저장된 모든 공고 (마감 포함) → [(사업 dict, 처음 본 시각)]"""
+    conn = open_program_db()
+    try:
+        return [
+            (json.loads(data), first_seen)
+            for data, first_seen in conn.execute("SELECT data, first_seen FROM programs")
+        ]
+    finally:
+        conn.close()
+
+def load_programs(source: str) -> tuple:
+    """저장된 모집중 공고와 마지막 동기화 시각"""
+    conn = open_program_db()
+    try:
+        row = conn.execute("SELECT synced_at FROM sync_state WHERE source = ?", (source,)).fetchone()
+        if row is None:
+            return [], None
+        programs = [
+            Program.from_dict(json.loads(data))
+            for (data,) in conn.execute(
+                "SELECT data FROM programs WHERE source = ? AND status = 'open' ORDER BY position", (source,)
+            )
+        ]
+        return programs, row[0]
+    finally:
+        conn.close()
+
+# ============================================
+# 지원사업 카탈로그 캐시 (stale-while-revalidate)
+# ============================================
+CATALOG_TTL = float(os.getenv("CATALOG_TTL", "600"))  # 이 시간(초) 안에는 캐시를 그대로 사용
+CATALOG_STALE_TTL = float(os.getenv("CATALOG_STALE_TTL", "86400"))  # 이 시간까지는 오래된 캐시를 즉시 반환하고 백그라운드 갱신
+
+CATALOG_SOURCES = {
+    "bizinfo": fetch_catalog_bizinfo,
+    "kstartup": fetch_catalog_kstartup,
+}
+
+catalog_entries = {}        # source -> {"programs": [...], "fetched_at": timestamp}
+catalog_refresh_tasks = {}  # source -> 진행 중인 갱신 Task
+# 데이터가 없는 소스는 항상 이 목록을 반환 (요청마다 새 []를 만들면 통합 뷰 메모가 매번 깨짐, 수정 금지)
+NO_PROGRAMS = []
+catalog_stats = defaultdict(int)
+
+async def refresh_catalog_source(source: str) -> list:
+    """업스트림에서 전체 목록을 다시 받아 캐시 갱신"""
+    try:
+        programs, complete = await CATALOG_SOURCES[source]()
     except Exception as e:
-        print(f"K-Startup API 오류: {e}")
-        return []
+        logger.warning(f"카탈로그 갱신 오류 ({source}): {e}")
+        programs, complete = NO_PROGRAMS, False
+    
+    entry = catalog_entries.get(source)
+    if not programs:
+        # 업스트림 오류로 빈 결과가 오면 기존 캐시를 유지
+        catalog_stats["refresh_errors"] += 1
+        return entry["programs"] if entry else NO_PROGRAMS
+    
+    fetched_at = time.time()
+    catalog_entries[source] = {"programs": programs, "fetched_at": fetched_at}
+    catalog_stats["refreshes"] += 1
+    
+    if PROGRAM_DB_PATH:
+        try:
+            await asyncio.to_thread(sync_programs, source, programs, fetched_at, complete)
+        except Exception as e:
+            logger.warning(f"저장소 동기화 오류 ({source}): {e}")
+        else:
+            await refresh_expected_index()
+    
+    return programs
+
+def schedule_catalog_refresh(source: str) -> asyncio.Task:
+    """소스별로 갱신 작업은 하나만 실행"""
+    task = catalog_refresh_tasks.get(source)
+    if task is None or task.done():
+        task = asyncio.create_task(refresh_catalog_source(source))
+        catalog_refresh_tasks[source] = task
+    return task
+
+async def get_catalog_source(source: str) -> list:
+    entry = catalog_entries.get(source)
+    if entry:
+        age = time.time() - entry["fetched_at"]
+        if age < CATALOG_TTL:
+            catalog_stats["hits"] += 1
+            return entry["programs"]
+        if age < CATALOG_STALE_TTL:
+            catalog_stats["stale_hits"] += 1
+            schedule_catalog_refresh(source)
+            return entry["programs"]
+    
+    catalog_stats["misses"] += 1
+    return await asyncio.shield(schedule_catalog_refresh(source))
+
+async def load_catalog_from_store():
+    """디스크에 저장된 카탈로그로 캐시를 미리 채움 (이후 갱신은 SWR로 진행)"""
+    if not PROGRAM_DB_PATH:
+        return
+    for source in CATALOG_SOURCES:
+        try:
+            programs, synced_at = await asyncio.to_thread(load_programs, source)
+        except Exception as e:
+            logger.warning(f"저장소 로드 오류 ({source}): {e}")
+            continue
+        if programs and source not in catalog_entries:
+            catalog_entries[source] = {"programs": programs, "fetched_at": synced_at}
+            catalog_stats["warm_starts"] += 1
+
+def start_catalog_warmup():
+    for source in CATALOG_SOURCES:
+        schedule_catalog_refresh(source)
+
+async def stop_catalog_refresh():
+    tasks = [t for t in catalog_refresh_tasks.values() if not t.done()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    catalog_refresh_tasks.clear()
+
+def get_catalog_status() -> dict:
+    now = time.time()
+    sources = {}
+    for source in CATALOG_SOURCES:
+        entry = catalog_entries.get(source)
+        task = catalog_refresh_tasks.get(source)
+        sources[source] = {
+            "count": len(entry["programs"]) if entry else 0,
+            "last_refresh": datetime.fromtimestamp(entry["fetched_at"]).isoformat() if entry else None,
+            "age_seconds": round(now - entry["fetched_at"], 1) if entry else None,
+            "refreshing": bool(task and not task.done()),
+        }
+    return {
+        "ttl": CATALOG_TTL,
+        "stale_ttl": CATALOG_STALE_TTL,
+        "hits": catalog_stats["hits"],
+        "stale_hits": catalog_stats["stale_hits"],
+        "misses": catalog_stats["misses"],
+        "refreshes": catalog_stats["refreshes"],
+        "refresh_errors": catalog_stats["refresh_errors"],
+        "deadline_skips": catalog_stats["deadline_skips"],
+        "full_crawl": CATALOG_FULL_CRAWL,
+        "singleflight": upstream_flight.status(),
+        "resilience": get_upstream_resilience_status(),
+        "crawl": crawl_reports,
+        "dedup": catalog_view["dedup"],
+        "version": catalog_view["fingerprint"][:12],
+        "listing": dict(listing_stats),
+        "expected": {
+            "programs": len(expected_index["programs"]),
+            "mined": expected_index["mined"],
+            "built_at": expected_index["built_at"],
+        },
+        "sources": sources,
+    }
+
+# ============================================
+# 업스트림 상태 감시 (백그라운드 프로버)
+# ============================================
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "60"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "5"))  # 업스트림 타임아웃과 별개로 짧게
+HEALTH_PROBE_WINDOW = int(os.getenv("HEALTH_PROBE_WINDOW", "20"))  # 오류율 계산에 쓰는 최근 프로브 수
+HEALTH_FAILURE_THRESHOLD = int(os.getenv("HEALTH_FAILURE_THRESHOLD", "3"))  # 연속 실패가 이 이상이면 error
+READY_MAX_CATALOG_AGE = float(os.getenv("READY_MAX_CATALOG_AGE", str(CATALOG_STALE_TTL)))
+
+async def probe_bizinfo():
+    programs, _ = await fetch_bizinfo_page({"searchCnt": 1})
+    return len(programs)
+
+async def probe_kstartup():
+    programs, _ = await fetch_kstartup_page(1, 1)
+    return len(programs)
+
+HEALTH_PROBES = {
+    "bizinfo": probe_bizinfo,
+    "kstartup": probe_kstartup,
+}
+
+upstream_health = {
+    name: {
+        "checks": 0,
+        "failures": 0,
+        "consecutive_failures": 0,
+        "latency_ms": None,
+        "last_success": None,
+        "last_failure": None,
+        "last_error": None,
+        "recent": deque(maxlen=HEALTH_PROBE_WINDOW),  # True=성공
+    }
+    for name in HEALTH_PROBES
+}
+health_probe_task = None
+
+async def probe_upstream(name: str):
+    state = upstream_health[name]
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(HEALTH_PROBES[name](), HEALTH_PROBE_TIMEOUT)
+        ok, error = True, None
+    except asyncio.TimeoutError:
+        ok, error = False, f"{HEALTH_PROBE_TIMEOUT:g}초 안에 응답 없음"
+    except Exception as e:
+        ok, error = False, str(e) or type(e).__name__
+    
+    state["checks"] += 1
+    state["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    state["recent"].append(ok)
+    if ok:
+        state["consecutive_failures"] = 0
+        state["last_success"] = time.time()
+    else:
+        state["failures"] += 1
+        state["consecutive_failures"] += 1
+        state["last_failure"] = time.time()
+        state["last_error"] = error
+
+async def run_health_prober():
+    while True:
+        await asyncio.gather(*(probe_upstream(name) for name in HEALTH_PROBES))
+        await asyncio.sleep(HEALTH_PROBE_INTERVAL)
+
+def start_health_prober():
+    global health_probe_task
+    if HEALTH_PROBE_INTERVAL > 0 and health_probe_task is None:
+        health_probe_task = asyncio.create_task(run_health_prober())
+
+async def stop_health_prober():
+    global health_probe_task
+    if health_probe_task is not None:
+        health_probe_task.cancel()
+        await asyncio.gather(health_probe_task, return_exceptions=True)
+        health_probe_task = None
+
+def upstream_status(name: str) -> str:
+    state = upstream_health[name]
+    if state["checks"] == 0:
+        return "unknown"
+    if state["consecutive_failures"] >= HEALTH_FAILURE_THRESHOLD:
+        return "error"
+    if state["consecutive_failures"] > 0:
+        return "degraded"
+    return "connected"
+
+def get_upstream_health() -> dict:
+    result = {}
+    for name, state in upstream_health.items():
+        recent = state["recent"]
+        result[name] = {
+            "status": upstream_status(name),
+            "latency_ms": state["latency_ms"],
+            "last_success": datetime.fromtimestamp(state["last_success"]).isoformat() if state["last_success"] else None,
+            "last_failure": datetime.fromtimestamp(state["last_failure"]).isoformat() if state["last_failure"] else None,
+            "last_error": state["last_error"],
+            "consecutive_failures": state["consecutive_failures"],
+            "error_rate": round(recent.count(False) / len(recent), 3) if recent else None,
+            "checks": state["checks"],
+        }
+    return result
+
+def get_readiness() -> tuple:
+    """(준비 여부, 소스별 상태) - 한 소스라도 READY_MAX_CATALOG_AGE 안에 갱신된 카탈로그가 있으면 준비됨"""
+    now = time.time()
+    sources = {}
+    for source in CATALOG_SOURCES:
+        entry = catalog_entries.get(source)
+        age = now - entry["fetched_at"] if entry else None
+        sources[source] = {
+            "ready": bool(entry and entry["programs"]) and age < READY_MAX_CATALOG_AGE,
+            "count": len(entry["programs"]) if entry else 0,
+            "age_seconds": round(age, 1) if age is not None else None,
+        }
+    return any(s["ready"] for s in sources.values()), sources
 
 # ============================================
 # 지역 키워드 목록
@@ -293,113 +1640,1278 @@ REGION_KEYWORDS = {
     "제주": ["제주", "서귀포"]
 }
 
-def get_other_regions(selected_region: str) -> list:
-    other_keywords = []
-    for region, keywords in REGION_KEYWORDS.items():
-        if region != selected_region:
-            other_keywords.extend(keywords)
-    return other_keywords
+# 키워드 → 지역 역색인과, 모든 지역 키워드를 한 번에 찾는 정규식
+# (전방탐색으로 겹치는 위치까지 모두 탐색, 같은 위치에서는 긴 키워드 우선)
+REGION_BY_KEYWORD = {kw: region for region, keywords in REGION_KEYWORDS.items() for kw in keywords}
+REGION_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(kw) for kw in sorted(REGION_BY_KEYWORD, key=len, reverse=True)) + "))"
+)
+
+NATIONWIDE_AGENCIES = [
+    "중소벤처기업부", "과학기술정보통신부", "산업통상자원부", 
+    "농림축산식품부", "환경부", "보건복지부", "고용노동부",
+    "창업진흥원", "중소기업진흥공단", "KOTRA", "정보통신산업진흥원",
+    "한국산업기술진흥원", "한국에너지공단"
+]
+NATIONWIDE_PATTERN = re.compile("|".join(re.escape(na) for na in NATIONWIDE_AGENCIES))
+
+def find_regions(text: str) -> frozenset:
+    """텍스트에 언급된 지역 집합 (한 번의 스캔)"""
+    if not text:
+        return frozenset()
+    return frozenset(REGION_BY_KEYWORD[m.group(1)] for m in REGION_PATTERN.finditer(text))
 
 def contains_other_region(name: str, selected_region: str) -> bool:
-    other_keywords = get_other_regions(selected_region)
-    name_lower = name.lower()
-    for keyword in other_keywords:
-        if keyword in name_lower:
-            return True
-    return False
+    return bool(find_regions(name) - {selected_region})
 
 def is_nationwide_program(name: str, agency: str) -> bool:
-    nationwide_agencies = [
-        "중소벤처기업부", "과학기술정보통신부", "산업통상자원부", 
-        "농림축산식품부", "환경부", "보건복지부", "고용노동부",
-        "창업진흥원", "중소기업진흥공단", "KOTRA", "정보통신산업진흥원",
-        "한국산업기술진흥원", "한국에너지공단"
-    ]
-    for na in nationwide_agencies:
-        if na in agency:
+    return bool(agency) and NATIONWIDE_PATTERN.search(agency) is not None
+
+def classify_program(program: dict) -> tuple:
+    """(전국 단위 기관 여부, 사업명에 언급된 지역, 소관 지역 필드의 지역)"""
+    return (
+        is_nationwide_program(program.get("name", ""), program.get("agency", "")),
+        find_regions(program.get("name", "")),
+        find_regions(program.get("region", "")),
+    )
+
+def program_in_region(program: dict, region: str, classification: Optional[tuple] = None) -> bool:
+    """선택 지역에 노출할 사업인지 (전국 사업은 다른 지역명이 없을 때만)"""
+    nationwide, name_regions, field_regions = classification or classify_program(program)
+    other_regions = name_regions - {region}
+    
+    if nationwide:
+        return not other_regions
+    
+    if region in REGION_KEYWORDS:
+        if region in name_regions or region in field_regions:
             return True
-    return False
+    elif region in program.get("name", "") or region in program.get("region", ""):
+        return True
+    
+    return not other_regions and not program.get("region", "")
+
+def build_region_partitions(programs: list) -> dict:
+    """사업마다 지역 분류를 한 번만 계산해 지역별 목록을 미리 생성"""
+    partitions = {region: [] for region in REGION_KEYWORDS}
+    for program in programs:
+        classification = classify_program(program)
+        for region, members in partitions.items():
+            if program_in_region(program, region, classification):
+                members.append(program)
+    return partitions
 
 # ============================================
-# 통합 검색
+# 로컬 키워드 검색 인덱스 (글자 n-gram 역색인)
 # ============================================
-async def search_all_programs(keyword: Optional[str] = None, region: str = "전체") -> list:
-    bizinfo_task = fetch_bizinfo_programs(keyword)
-    kstartup_task = fetch_kstartup_programs(keyword)
+KEYWORD_MIN_COVERAGE = float(os.getenv("KEYWORD_MIN_COVERAGE", "0.6"))  # 검색어 n-gram 중 이 비율 이상 포함해야 결과에 포함
+
+# 필드별 가중치 (사업명 일치가 가장 중요)
+SEARCH_FIELD_WEIGHTS = {
+    "name": 3.0,
+    "target": 1.5,
+    "agency": 1.0,
+    "support_amount": 1.0,
+}
+
+TOKEN_SPLIT_PATTERN = re.compile(r"[^0-9a-z가-힣]+")
+
+def ngram_tokens(text: str) -> list:
+    """단어별 글자 2-gram (한 글자 단어는 그대로) - 띄어쓰기가 다른 복합어도 매칭"""
+    grams = []
+    for word in TOKEN_SPLIT_PATTERN.split(text.lower()):
+        if len(word) == 1:
+            grams.append(word)
+        else:
+            grams.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return grams
+
+def build_search_index(programs: list) -> dict:
+    """n-gram → {문서 번호: 필드 가중 빈도} 역색인과 문서 길이"""
+    postings = defaultdict(dict)
+    lengths = []
+    for doc, program in enumerate(programs):
+        length = 0.0
+        for field, weight in SEARCH_FIELD_WEIGHTS.items():
+            for gram in ngram_tokens(program.get(field) or ""):
+                docs = postings[gram]
+                docs[doc] = docs.get(doc, 0.0) + weight
+                length += weight
+        lengths.append(length)
+    return {
+        "programs": programs,
+        "postings": dict(postings),
+        "lengths": lengths,
+        "avg_length": (sum(lengths) / len(lengths) if lengths else 0.0) or 1.0,
+        "positions": {id(program): doc for doc, program in enumerate(programs)},
+    }
+
+def search_index(index: dict, keyword: str) -> list:
+    """검색어 n-gram 포함 비율 → TF-IDF 점수 순으로 정렬된 지원사업 목록"""
+    query = set(ngram_tokens(keyword))
+    if not query:
+        return []
     
-    bizinfo_results, kstartup_results = await asyncio.gather(
-        bizinfo_task, 
-        kstartup_task,
-        return_exceptions=True
-    )
+    doc_count = len(index["programs"])
+    scores = defaultdict(float)
+    hits = defaultdict(int)
+    for gram in query:
+        docs = index["postings"].get(gram)
+        if not docs:
+            continue
+        idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+        for doc, weight in docs.items():
+            scores[doc] += idf * weight
+            hits[doc] += 1
     
-    all_programs = []
+    min_hits = max(1, math.ceil(len(query) * KEYWORD_MIN_COVERAGE))
+    ranked = sorted(
+        (doc for doc, count in hits.items() if count >= min_hits),
+        key=lambda doc: (-hits[doc], -scores[doc], doc),
+    )
+    return [index["programs"][doc] for doc in ranked]
+
+# ============================================
+# 소스 간 중복 공고 병합 (기업마당 ↔ K-Startup)
+# ============================================
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_SIMILARITY = float(os.getenv("DEDUP_SIMILARITY", "0.8"))  # 정규화한 사업명 2-gram Jaccard 기준
+
+# 연도, 괄호 안 내용, 차수/회차, 공고 관련 상투어 제거
+NAME_NOISE_PATTERNS = [
+    re.compile(r"\[[^\]]*\]|\([^)]*\)|「[^」]*」|【[^】]*】|<[^>]*>|〈[^〉]*〉"),
+    re.compile(r"20\d{2}\s*(년도|년)?|'\d{2}\s*년?"),
+    re.compile(r"(제\s*)?\d+\s*(차|회차|회|기)"),
+    re.compile(r"(재)?공고|모집|안내|신청|접수|변경"),
+    re.compile(r"[^0-9a-z가-힣]+"),
+]
+
+def normalize_program_name(name: str) -> str:
+    normalized = (name or "").lower()
+    for pattern in NAME_NOISE_PATTERNS:
+        normalized = pattern.sub("", normalized)
+    return normalized
+
+# 정규화로 지워지지만 서로 다른 공고를 가르는 정보
+NAME_YEAR_PATTERN = re.compile(r"(20\d{2})\s*(?:년도|년)?|'(\d{2})\s*년")
+NAME_ROUND_PATTERN = re.compile(r"(?:제\s*)?(\d+)\s*(?:차|회차|회|기)")
+PERIOD_DATE_PATTERN = re.compile(r"(20\d{2})[-./]?(\d{1,2})[-./]?(\d{1,2})")
+
+def program_signature(program: dict) -> tuple:
+    """(사업명 지역, 소관 지역, 연도, 차수, 기관, 접수 기간) - 정규화 키가 같아도 이 값이 어긋나면 다른 공고"""
+    name = program.get("name", "") or ""
+    dates = sorted(f"{y}{int(m):02d}{int(d):02d}" for y, m, d in PERIOD_DATE_PATTERN.findall(program.get("period", "") or ""))
+    return (
+        find_regions(name),
+        find_regions(program.get("region", "")),
+        frozenset(full or f"20{short}" for full, short in NAME_YEAR_PATTERN.findall(name)),
+        frozenset(NAME_ROUND_PATTERN.findall(name)),
+        re.sub(r"\s+", "", program.get("agency", "") or ""),
+        (dates[0], dates[-1]) if dates else None,
+    )
+
+def signatures_compatible(a: tuple, b: tuple) -> bool:
+    """한쪽에만 있는 정보는 허용하고, 양쪽에 있는 정보가 다르면 병합하지 않음"""
+    name_regions_a, field_regions_a, years_a, rounds_a, agency_a, span_a = a
+    name_regions_b, field_regions_b, years_b, rounds_b, agency_b, span_b = b
+    if name_regions_a != name_regions_b:
+        return False
+    if field_regions_a and field_regions_b and field_regions_a != field_regions_b:
+        return False
+    if (years_a and years_b and years_a != years_b) or (rounds_a and rounds_b and rounds_a != rounds_b):
+        return False
+    if span_a and span_b and (span_a[0] > span_b[1] or span_b[0] > span_a[1]):
+        return False  # 접수 기간이 겹치지 않음
+    if agency_a and agency_b and agency_a not in agency_b and agency_b not in agency_a:
+        # 소관 부처/수행 기관으로 다르게 적힐 수 있으므로 접수 기간까지 같을 때만 같은 공고로 봄
+        return span_a is not None and span_a == span_b
+    return True
+
+def name_bigrams(normalized: str) -> set:
+    if len(normalized) < 2:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + 2] for i in range(len(normalized) - 1)}
+
+def merge_program_cluster(records: list) -> Program:
+    """첫 소스 레코드를 기준으로, 빈 필드는 다른 소스 값으로 채우고 양쪽 URL을 보존"""
+    merged = dict(records[0])
+    for record in records[1:]:
+        for field, value in record.items():
+            if value and not merged.get(field):
+                merged[field] = value
+    merged["sources"] = [r.get("source", "") for r in records]
+    merged["urls"] = [r.get("url", "") for r in records if r.get("url")]
+    merged["merged_ids"] = [r.get("id", "") for r in records]
+    return Program.from_dict(merged)
+
+def dedupe_programs(source_lists: list) -> tuple:
+    """정규화 해시 → 2-gram 유사도 순으로 다른 소스의 같은 공고를 묶어 하나로 병합
+
+    같은 소스 안의 레코드끼리는 병합하지 않음 (차수만 다른 별도 공고일 수 있음)
+    지역/연도/차수/기관/접수 기간이 어긋나는 쌍은 이름이 같아도 병합하지 않음
+    유사도 후보는 prefix filtering으로 탐색 - 희귀한 2-gram 앞부분만 색인해도
+    Jaccard ≥ 기준인 쌍은 반드시 후보에 포함됨
+    반환: (병합된 목록, 통계)
+    """
+    entries = []
+    doc_freq = defaultdict(int)
+    for programs in source_lists:
+        for program in programs:
+            key = normalize_program_name(program.get("name", ""))
+            grams = name_bigrams(key)
+            for gram in grams:
+                doc_freq[gram] += 1
+            entries.append((program, key, grams, program_signature(program)))
     
-    if isinstance(bizinfo_results, list):
-        all_programs.extend(bizinfo_results)
+    def prefix(grams: set) -> list:
+        ordered = sorted(grams, key=lambda gram: (doc_freq[gram], gram))
+        return ordered[:len(ordered) - math.ceil(DEDUP_SIMILARITY * len(ordered)) + 1]
     
-    if isinstance(kstartup_results, list):
-        all_programs.extend(kstartup_results)
+    clusters = []  # [레코드 목록, 소스 집합, 2-gram 집합, 기준 레코드 시그니처]
+    by_key = defaultdict(list)
+    prefix_index = defaultdict(list)
+    stats = {"input": len(entries), "exact": 0, "similar": 0}
     
-    if region != "전체":
-        filtered = []
-        selected_keywords = REGION_KEYWORDS.get(region, [region])
+    for program, key, grams, signature in entries:
+        source = program.get("source", "")
         
-        for p in all_programs:
-            name = p.get("name", "")
-            agency = p.get("agency", "")
-            p_region = p.get("region", "")
-            
-            if is_nationwide_program(name, agency):
-                if not contains_other_region(name, region):
-                    filtered.append(p)
-                continue
-            
-            for kw in selected_keywords:
-                if kw in name or kw in p_region:
-                    filtered.append(p)
+        target = None
+        if key:
+            for idx in by_key[key]:
+                if source not in clusters[idx][1] and signatures_compatible(signature, clusters[idx][3]):
+                    target = idx
+                    stats["exact"] += 1
                     break
-            else:
-                if not contains_other_region(name, region) and not p_region:
-                    filtered.append(p)
         
-        return filtered
-    
-    return all_programs
-
-# ============================================
-# 예상 공고 매칭
-# ============================================
-def get_expected_programs(keywords: List[str]) -> list:
-    expected = []
-    
-    for program in RECURRING_PROGRAMS:
-        match_count = 0
-        for kw in keywords:
-            for prog_kw in program["keywords"]:
-                if kw.lower() in prog_kw.lower() or prog_kw.lower() in kw.lower():
-                    match_count += 1
-                    break
+        gram_prefix = prefix(grams)
+        if target is None and grams:
+            best_score = DEDUP_SIMILARITY
+            candidates = {idx for gram in gram_prefix for idx in prefix_index.get(gram, ())}
+            for idx in sorted(candidates):
+                if source in clusters[idx][1] or not signatures_compatible(signature, clusters[idx][3]):
+                    continue
+                cluster_grams = clusters[idx][2]
+                shared = len(grams & cluster_grams)
+                score = shared / (len(grams) + len(cluster_grams) - shared)
+                if score >= best_score:
+                    target, best_score = idx, score
+            if target is not None:
+                stats["similar"] += 1
         
-        if match_count > 0:
-            expected.append({
-                "name": program["name"],
-                "agency": program["agency"],
-                "expected_month": f"2026년 {program['expected_month']}",
-                "category": program["category"],
-                "match_score": min(95, 70 + match_count * 10),
-                "type": "expected"
-            })
+        if target is not None:
+            clusters[target][0].append(program)
+            clusters[target][1].add(source)
+            continue
+        
+        idx = len(clusters)
+        clusters.append([[program], {source}, grams, signature])
+        if key:
+            by_key[key].append(idx)
+        for gram in gram_prefix:
+            prefix_index[gram].append(idx)
     
-    expected.sort(key=lambda x: x["match_score"], reverse=True)
-    return expected[:5]
+    merged = [records[0] if len(records) == 1 else merge_program_cluster(records) for records, _, _, _ in clusters]
+    stats["output"] = len(merged)
+    return merged, stats
 
 # ============================================
-# API 엔드포인트 (기존)
+# 통합 검색
 # ============================================
+catalog_view = {
+    "version": 0, "fingerprint": "", "sources": (), "programs": [], "by_source": {},
+    "partitions": {}, "index": None, "lookup": None, "dedup": None,
+}
 
-@app.get("/")
-async def root():
+def catalog_fingerprint(programs: list) -> str:
+    """카탈로그 내용 해시 - 워커/재시작과 무관하게 같은 데이터면 같은 값 (ETag 기반)"""
+    return hashlib.sha1(dump_json(programs)).hexdigest()
+
+def build_source_partitions(programs: list) -> dict:
+    """소스 → 사업 목록 (병합된 레코드는 양쪽 소스에 모두 포함)"""
+    partitions = defaultdict(list)
+    for program in programs:
+        for source in program.get("sources") or [program.get("source", "")]:
+            partitions[source].append(program)
+    return dict(partitions)
+
+def get_catalog_view(source_lists: list) -> dict:
+    """소스별 목록이 바뀐 경우에만 통합 목록(중복 병합), 지역 파티션, 검색 인덱스를 다시 생성"""
+    cached = catalog_view["sources"]
+    if len(cached) == len(source_lists) and all(a is b for a, b in zip(cached, source_lists)):
+        return catalog_view
+    
+    if DEDUP_ENABLED:
+        programs, dedup_stats = dedupe_programs(source_lists)
+    else:
+        programs, dedup_stats = [p for programs in source_lists for p in programs], None
+    catalog_view.update(
+        dedup=dedup_stats,
+        version=catalog_view["version"] + 1,
+        fingerprint=catalog_fingerprint(programs),
+        sources=tuple(source_lists),
+        programs=programs,
+        by_source=build_source_partitions(programs),
+        partitions=build_region_partitions(programs),
+        index=build_search_index(programs),
+        lookup=build_program_lookup(programs),
+    )
+    return catalog_view
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    """deadline(time.monotonic 기준 절대 시각)까지 남은 초, 마감이 없으면 None"""
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+def catalog_freshness(source: str) -> str:
+    entry = catalog_entries.get(source)
+    if not entry or not entry["programs"]:
+        return "missing"
+    return "fresh" if time.time() - entry["fetched_at"] < CATALOG_TTL else "stale"
+
+async def read_catalog_source(source: str, deadline: Optional[float] = None) -> list:
+    """마감 시각까지만 기다리고, 그 안에 못 받으면 마지막 스냅샷(없으면 빈 목록)으로 대체
+
+    갱신 작업은 shield되어 있어 마감으로 끊겨도 백그라운드에서 계속 진행
+    """
+    entry = catalog_entries.get(source)
+    if deadline is None or (entry and time.time() - entry["fetched_at"] < CATALOG_STALE_TTL):
+        # 캐시 적중 경로는 기다리지 않음
+        return await get_catalog_source(source)
+    try:
+        return await asyncio.wait_for(get_catalog_source(source), timeout=time_left(deadline))
+    except asyncio.TimeoutError:
+        catalog_stats["deadline_skips"] += 1
+        entry = catalog_entries.get(source)
+        return entry["programs"] if entry else NO_PROGRAMS
+
+async def search_all_programs(keyword: Optional[str] = None, region: str = "전체",
+                              deadline: Optional[float] = None, freshness: Optional[dict] = None) -> list:
+    """통합 지원사업 목록 (반환된 목록은 카탈로그와 공유되므로 수정하지 말 것)
+
+    키워드가 있으면 로컬 인덱스에서 관련도 순으로 검색
+    deadline이 있으면 그때까지 응답한 소스만 사용하고, freshness에 소스별 fresh/stale/missing 기록
+    """
+    with observe_stage("catalog_read"):
+        bizinfo_results, kstartup_results = await asyncio.gather(
+            read_catalog_source("bizinfo", deadline),
+            read_catalog_source("kstartup", deadline),
+            return_exceptions=True
+        )
+    
+    source_lists = [
+        results if isinstance(results, list) else NO_PROGRAMS
+        for results in (bizinfo_results, kstartup_results)
+    ]
+    if freshness is not None:
+        for source in CATALOG_SOURCES:
+            freshness[source] = catalog_freshness(source)
+    with observe_stage("catalog_view"):
+        view = get_catalog_view(source_lists)
+    
+    if region == "전체":
+        programs = view["programs"]
+    elif region in view["partitions"]:
+        programs = view["partitions"][region]
+    else:
+        with observe_stage("region_filter"):
+            programs = [p for p in view["programs"] if program_in_region(p, region)]
+    
+    if keyword:
+        with observe_stage("keyword_search"):
+            in_region = programs is view["programs"] or {id(p) for p in programs}
+            ranked = search_index(view["index"], keyword)
+            return ranked if in_region is True else [p for p in ranked if id(p) in in_region]
+    
+    return programs
+
+async def search_source_programs(source: str, keyword: Optional[str] = None) -> list:
+    """소스별 목록 - 통합 카탈로그에서 해당 소스 사업만 (키워드는 로컬 인덱스로 검색)"""
+    await search_all_programs()
+    view = catalog_view
+    programs = view["by_source"].get(source, [])
+    if keyword:
+        in_source = {id(p) for p in programs}
+        return [p for p in search_index(view["index"], keyword) if id(p) in in_source]
+    return programs
+
+# ============================================
+# 목록 응답 (커서 페이지네이션 / 필드 선택 / ETag / 압축)
+# ============================================
+LISTING_MAX_LIMIT = int(os.getenv("LISTING_MAX_LIMIT", "1000"))
+LISTING_COMPRESS_MIN_BYTES = int(os.getenv("LISTING_COMPRESS_MIN_BYTES", "1024"))
+LISTING_CACHE_SIZE = int(os.getenv("LISTING_CACHE_SIZE", "64"))  # 인코딩된 응답 본문 캐시
+
+listing_cache = OrderedDict()  # (ETag, 인코딩) -> 본문 bytes
+listing_stats = defaultdict(int)
+
+def brotli_module():
+    """brotli 압축은 brotli 패키지가 있을 때만 사용 (pip install brotli)"""
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    if accepted.get("br", 0) > 0 and brotli_module():
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+def encode_cursor(query_hash: str, offset: int, last: Optional[dict]) -> str:
+    data = {"q": query_hash, "v": catalog_view["fingerprint"][:12], "o": offset, "after": program_ref(last) if last else ""}
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, query_hash: str, programs: list) -> int:
+    """커서 → 시작 위치 (카탈로그가 바뀌었으면 마지막으로 본 사업 다음부터)"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(data["o"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+    if data.get("q") != query_hash:
+        raise HTTPException(status_code=400, detail="cursor가 현재 검색 조건과 다릅니다.")
+    
+    if data.get("v") == catalog_view["fingerprint"][:12] or not data.get("after"):
+        return offset
+    for position, program in enumerate(programs):
+        if program_ref(program) == data["after"]:
+            return position + 1
+    return offset
+
+def project_fields(programs: list, fields: Optional[str]) -> list:
+    if not fields:
+        return programs
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    return [{f: p[f] for f in names if f in p} for p in programs]
+
+LISTING_POSITION_PARAMS = ("cursor", "limit", "count", "page")  # 검색 조건이 아니라 페이지 위치/크기
+
+def listing_response(request: Request, programs: list, meta: dict, limit: Optional[int] = None,
+                     cursor: Optional[str] = None, fields: Optional[str] = None, offset: int = 0) -> Response:
+    """카탈로그 목록 응답 - 같은 카탈로그/같은 조건이면 ETag로 304, 본문은 인코딩별로 캐시
+
+    offset은 cursor가 없을 때의 시작 위치 (예전 page 파라미터), 커서에는 항상 전체 목록 기준 위치를 기록
+    """
+    # 커서는 같은 검색 조건(페이지 크기/시작 위치 제외)에서만 유효
+    query = sorted((k, v) for k, v in request.query_params.items() if k not in LISTING_POSITION_PARAMS)
+    query_hash = hashlib.sha1(json.dumps([request.url.path, query], ensure_ascii=False).encode()).hexdigest()[:12]
+    start = decode_cursor(cursor, query_hash, programs) if cursor else max(0, offset)
+    etag = 'W/"' + hashlib.sha1(f"{catalog_view['fingerprint']}:{query_hash}:{start}:{limit}".encode()).hexdigest()[:24] + '"'
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        listing_stats["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    
+    cache_key = (etag, encoding)
+    body = listing_cache.get(cache_key)
+    if body is None:
+        end = len(programs) if not limit else start + max(1, min(limit, LISTING_MAX_LIMIT))
+        page = programs[start:end]
+        payload = {
+            **meta,
+            "count": len(page),
+            "total": len(programs),
+            "programs": project_fields(page, fields),
+            "next_cursor": encode_cursor(query_hash, end, page[-1] if page else None) if end < len(programs) else None,
+        }
+        body = dump_json(payload)
+        if len(body) < LISTING_COMPRESS_MIN_BYTES:
+            encoding = None
+            cache_key = (etag, None)
+        elif encoding == "br":
+            body = brotli_module().compress(body, quality=5)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=6)
+        listing_cache[cache_key] = body
+        while len(listing_cache) > LISTING_CACHE_SIZE:
+            listing_cache.popitem(last=False)
+        listing_stats["rendered"] += 1
+    else:
+        listing_cache.move_to_end(cache_key)
+        listing_stats["cache_hits"] += 1
+    
+    if encoding and cache_key[1] == encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# ============================================
+# 매칭 후보 선정 (BM25 사전 랭킹)
+# ============================================
+MATCH_TOP_K = int(os.getenv("MATCH_TOP_K", "50"))  # LLM에 넘길 후보 수
+MATCH_DEADLINE = float(os.getenv("MATCH_DEADLINE", "60"))  # /match 요청 전체 예산 (초), X-Deadline-Ms 헤더로 더 짧게 지정 가능
+MATCH_LLM_RESERVE = float(os.getenv("MATCH_LLM_RESERVE", "30"))  # 카탈로그를 기다리지 않고 LLM 호출에 남겨둘 시간 (초, 최대 예산의 절반)
+N2B_KEYWORD_WEIGHT = float(os.getenv("N2B_KEYWORD_WEIGHT", "2.0"))  # 키워드를 N/B/B 본문보다 중요하게
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def n2b_query_terms(n2b: dict) -> dict:
+    """N2B 분석 결과 → {n-gram: 질의 가중치}"""
+    terms = defaultdict(float)
+    for keyword in n2b.get("keywords") or []:
+        for gram in ngram_tokens(str(keyword)):
+            terms[gram] += N2B_KEYWORD_WEIGHT
+    for field in ("not", "but", "because"):
+        for gram in ngram_tokens(str(n2b.get(field) or "")):
+            terms[gram] += 1.0
+    return terms
+
+def bm25_scores(index: dict, terms: dict, docs: Optional[set] = None) -> dict:
+    """BM25 점수 {문서 번호: 점수} (docs가 있으면 해당 문서만 채점)"""
+    doc_count = len(index["programs"])
+    lengths = index["lengths"]
+    avg_length = index["avg_length"]
+    scores = defaultdict(float)
+    
+    for gram, query_weight in terms.items():
+        postings = index["postings"].get(gram)
+        if not postings:
+            continue
+        idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+        for doc, tf in postings.items():
+            if docs is not None and doc not in docs:
+                continue
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc] / avg_length)
+            scores[doc] += query_weight * idf * tf * (BM25_K1 + 1) / norm
+    return scores
+
+@observe_stage("rank")
+def rank_programs(programs: list, n2b: dict, top_k: int = MATCH_TOP_K) -> list:
+    """필터링된 전체 목록을 N2B 분석과의 관련도로 정렬 → [(지원사업, 점수)] 상위 top_k"""
+    index = catalog_view["index"]
+    docs = None
+    if index is None or any(id(p) not in index["positions"] for p in programs):
+        # 카탈로그 밖의 목록이면 임시 인덱스로 채점
+        index = build_search_index(programs)
+    elif programs is not index["programs"]:
+        docs = {index["positions"][id(p)] for p in programs}
+    
+    scores = bm25_scores(index, n2b_query_terms(n2b), docs)
+    ranked = sorted(scores, key=lambda doc: (-scores[doc], doc))[:top_k]
+    results = [(index["programs"][doc], scores[doc]) for doc in ranked]
+    
+    # 관련 사업이 top_k보다 적으면 나머지는 원래 순서대로 채움
+    if len(results) < top_k:
+        chosen = {id(p) for p, _ in results}
+        for p in programs:
+            if len(results) >= top_k:
+                break
+            if id(p) not in chosen:
+                results.append((p, 0.0))
+    return results
+
+def build_match_prompt(n2b: dict, region: str, programs: list) -> str:
+    keywords = n2b.get('keywords', [])
+    programs_text = "\n".join(format_program_line(program_ref(p), p) for p in programs)
+    
+    return f"""다음 N2B 분석 결과에 가장 적합한 지원사업 5개를 추천해주세요.
+
+N2B 분석:
+- 문제점: {n2b.get('not', '')}
+- 해결책: {n2b.get('but', '')}
+- 근거: {n2b.get('because', '')}
+- 키워드: {', '.join(keywords) if keywords else '없음'}
+
+현재 모집중인 지원사업 (지역: {region}):
+{programs_text if programs_text else '현재 모집중인 사업이 없습니다.'}
+
+JSON 형식으로만 응답 (다른 텍스트 없이, id는 목록의 [ ] 안 값을 그대로):
+[
+  {{"id": "사업ID", "name": "사업명", "agency": "기관", "period": "접수기간", "reason": "추천 이유", "fit_score": 95}},
+  ...
+]
+
+적합한 사업이 없으면 빈 배열 []로 응답."""
+
+# ============================================
+# 매칭 프롬프트 (고정 지시문 프롬프트 캐싱)
+# ============================================
+# 사용자마다 후보가 달라 공유되는 부분은 지시문/응답 형식뿐 - 지시문이 모델의 최소 캐시 길이보다
+# 짧아 실제 절감이 확인되기 전까지 기본값은 끔 (끄면 user-008의 단일 프롬프트와 동일)
+MATCH_PROMPT_CACHE = os.getenv("MATCH_PROMPT_CACHE", "false").lower() == "true"
+
+MATCH_INSTRUCTIONS = """아래 N2B 분석 결과에 가장 적합한 지원사업 5개를 후보 목록에서 추천해주세요.
+
+JSON 형식으로만 응답 (다른 텍스트 없이, id는 목록의 [ ] 안 값을 그대로):
+[
+  {"id": "사업ID", "name": "사업명", "agency": "기관", "period": "접수기간", "reason": "추천 이유", "fit_score": 95},
+  ...
+]
+
+적합한 사업이 없으면 빈 배열 []로 응답."""
+
+def format_program_line(label: str, p: dict) -> str:
+    return f"[{label}] {p['name']} | 기관: {p.get('agency', '')} | 기간: {p.get('period', '미정')}"
+
+@observe_stage("match_prompt")  # 후보 순위 계산 포함
+def build_match_content(n2b: dict, region: str, all_programs: list):
+    """/match 프롬프트 - 관련도 상위 후보만 전달 (캐시를 켜면 고정 지시문을 캐시 가능한 접두부로 분리)"""
+    # 지역 필터링된 전체 목록에서 관련도 상위 후보 선정
+    candidates = [p for p, _ in rank_programs(all_programs, n2b)]
+    if not MATCH_PROMPT_CACHE:
+        return build_match_prompt(n2b, region, candidates)
+    
+    keywords = n2b.get('keywords', [])
+    programs_text = "\n".join(format_program_line(program_ref(p), p) for p in candidates)
+    user_text = f"""N2B 분석:
+- 문제점: {n2b.get('not', '')}
+- 해결책: {n2b.get('but', '')}
+- 근거: {n2b.get('because', '')}
+- 키워드: {', '.join(keywords) if keywords else '없음'}
+
+후보 지원사업 (지역: {region}):
+{programs_text if programs_text else '현재 모집중인 사업이 없습니다.'}"""
+    
+    return [
+        {"type": "text", "text": MATCH_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": user_text},
+    ]
+
+def prompt_cache_usage(message) -> dict:
+    usage = getattr(message, "usage", None)
+    return {
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+    }
+
+def match_deadlines(request: Request) -> tuple:
+    """요청 예산 → (전체 마감, 카탈로그 대기 마감) - X-Deadline-Ms 헤더가 있으면 설정값보다 우선"""
+    budget = MATCH_DEADLINE
+    header = request.headers.get("x-deadline-ms")
+    if header:
+        try:
+            budget = min(budget, max(0.0, float(header) / 1000))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="X-Deadline-Ms는 밀리초 숫자여야 합니다.")
+    started = time.monotonic()
+    # 짧은 예산에서도 카탈로그를 읽을 시간이 남도록 LLM 몫은 예산의 절반까지만
+    return started + budget, started + budget - min(MATCH_LLM_RESERVE, budget / 2)
+
+async def create_message_by(deadline: float, api_key: str, **kwargs):
+    """남은 예산 안에서만 Claude 응답을 기다림 (공유 호출은 single-flight에서 계속 진행)"""
+    try:
+        return await asyncio.wait_for(create_message(api_key, **kwargs), timeout=time_left(deadline))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="요청 시간 예산 안에 추천을 완료하지 못했습니다.")
+
+# ============================================
+# LLM 추천 결과 ↔ 카탈로그 연결 (ID 색인 + 사업명 유사도 보조 색인)
+# ============================================
+RECONCILE_MIN_SIMILARITY = float(os.getenv("RECONCILE_MIN_SIMILARITY", "0.5"))
+
+SOURCE_REF_PREFIX = {"기업마당": "B", "K-Startup": "K"}
+
+def program_ref(program: dict) -> str:
+    """프롬프트와 응답에서 쓰는 안정적인 사업 ID (예: B-PBLN_000000000112345, K-176543)"""
+    prefix = SOURCE_REF_PREFIX.get(program.get("source", ""), "X")
+    if program.get("id"):
+        return f"{prefix}-{program['id']}"
+    return f"{prefix}-" + hashlib.sha1(program.get("name", "").encode()).hexdigest()[:10]
+
+def build_program_lookup(programs: list) -> dict:
+    """ID → 사업 해시 색인, 원문/정규화 사업명 → 사업, 사업명 2-gram 역색인"""
+    refs = {}
+    exact = {}
+    names = {}
+    grams = defaultdict(list)
+    name_grams = []
+    for doc, program in enumerate(programs):
+        refs.setdefault(program_ref(program), program)
+        # 병합된 레코드는 원래 소스의 ID로도 찾을 수 있게
+        for source, merged_id in zip(program.get("sources") or [], program.get("merged_ids") or []):
+            refs.setdefault(program_ref({"source": source, "id": merged_id, "name": program.get("name", "")}), program)
+        
+        exact.setdefault(" ".join(program.get("name", "").split()), program)
+        key = normalize_program_name(program.get("name", ""))
+        names.setdefault(key, program)
+        doc_grams = name_bigrams(key)
+        name_grams.append(doc_grams)
+        for gram in doc_grams:
+            grams[gram].append(doc)
+    return {"programs": programs, "refs": refs, "exact": exact, "names": names, "grams": dict(grams), "name_grams": name_grams}
+
+def find_program_by_name(lookup: dict, name: str) -> Optional[dict]:
+    """모델이 ID를 빠뜨리거나 사업명을 조금 바꿔 쓴 경우 - 원문 → 정규화 이름 → 2-gram 유사도 순"""
+    program = lookup["exact"].get(" ".join(name.split()))
+    if program is not None:
+        return program
+    key = normalize_program_name(name)
+    if not key:
+        return None
+    if key in lookup["names"]:
+        return lookup["names"][key]
+    
+    query = name_bigrams(key)
+    shared = defaultdict(int)
+    for gram in query:
+        for doc in lookup["grams"].get(gram, ()):
+            shared[doc] += 1
+    
+    best_doc, best_score = None, RECONCILE_MIN_SIMILARITY
+    for doc in sorted(shared):
+        count = shared[doc]
+        score = count / (len(query) + len(lookup["name_grams"][doc]) - count)
+        if score > best_score or (best_doc is None and score >= best_score):
+            best_doc, best_score = doc, score
+    return lookup["programs"][best_doc] if best_doc is not None else None
+
+def get_program_lookup(programs: list) -> dict:
+    if catalog_view["lookup"] is not None and (
+        programs is catalog_view["programs"] or any(programs is p for p in catalog_view["partitions"].values())
+    ):
+        return catalog_view["lookup"]
+    return build_program_lookup(programs)
+
+@observe_stage("reconcile")
+def reconcile_matches(matched_programs: list, all_programs: list) -> list:
+    """추천 결과마다 ID로 O(1) 조회, 실패하면 사업명 보조 색인으로 url/period 복원"""
+    lookup = get_program_lookup(all_programs)
+    for mp in matched_programs:
+        if not isinstance(mp, dict):
+            continue
+        ref = str(mp.get("id") or "").strip().strip("[]")
+        program = lookup["refs"].get(ref)
+        if program is None and mp.get("name"):
+            program = find_program_by_name(lookup, mp["name"])
+        if program is None:
+            continue
+        
+        mp["id"] = program_ref(program)
+        mp["url"] = program.get("url", "")
+        mp["period"] = program.get("period", mp.get("period", ""))
+        if program.get("urls"):
+            mp["urls"] = program["urls"]
+    return matched_programs
+
+# ============================================
+# 예상 공고 매칭 (저장소 이력에서 반복 공고 학습 + 키워드 역색인)
+# ============================================
+EXPECTED_MIN_YEARS = int(os.getenv("EXPECTED_MIN_YEARS", "2"))  # 서로 다른 해에 이만큼 나온 공고를 반복 공고로 판단
+EXPECTED_MAX_KEYWORDS = 8  # 사업명에서 뽑는 키워드 수
+EXPECTED_QUERY_MAX_KEYWORDS = 20  # /api/programs/expected 한 번에 받을 키워드 수
+EXPECTED_QUERY_MAX_LENGTH = 50  # 키워드 하나의 최대 길이
+EXPECTED_STOPWORDS = {"지원사업", "지원", "사업", "및", "위한", "대상", "참여", "참여기업", "기업", "계획", "통합", "연장"}
+
+def name_keywords(name: str) -> list:
+    """사업명 → 키워드 (연도/차수/괄호 등 잡음 제거 후 단어 단위)"""
+    text = (name or "").lower()
+    for pattern in NAME_NOISE_PATTERNS[:-1]:
+        text = pattern.sub(" ", text)
+    words = []
+    for word in TOKEN_SPLIT_PATTERN.split(text):
+        if len(word) >= 2 and word not in EXPECTED_STOPWORDS and word not in words:
+            words.append(word)
+    return words[:EXPECTED_MAX_KEYWORDS]
+
+def announcement_month(program: dict, first_seen: float) -> tuple:
+    """(연도, 월) - 접수 시작일이 있으면 그 날짜, 없으면 처음 수집한 날짜"""
+    match = PERIOD_DATE_PATTERN.search(program.get("period", "") or "")
+    if match and 1 <= int(match.group(2)) <= 12:
+        return int(match.group(1)), int(match.group(2))
+    seen = datetime.fromtimestamp(first_seen)
+    return seen.year, seen.month
+
+def mine_recurring_programs(history: list) -> list:
+    """정규화 사업명이 같은 공고를 묶어, EXPECTED_MIN_YEARS 이상 서로 다른 해에 나온 것만 반복 공고로"""
+    groups = defaultdict(list)
+    for program, first_seen in history:
+        key = normalize_program_name(program.get("name", ""))
+        if key:
+            groups[key].append((announcement_month(program, first_seen), program))
+    
+    mined = []
+    for key, occurrences in groups.items():
+        years = {year for (year, _), _ in occurrences}
+        if len(years) < EXPECTED_MIN_YEARS:
+            continue
+        # 가장 자주 나온 월 (같으면 최근 공고의 월)
+        occurrences.sort(key=lambda o: o[0])
+        months = defaultdict(int)
+        for (_, month), _ in occurrences:
+            months[month] += 1
+        latest = occurrences[-1][1]
+        month = max(months, key=lambda m: (months[m], m == occurrences[-1][0][1]))
+        mined.append({
+            "key": key,
+            "name": latest.get("name", ""),
+            "agency": latest.get("agency", ""),
+            "month": month,
+            "category": "",
+            "keywords": name_keywords(latest.get("name", "")),
+            "occurrences": len(years),
+        })
+    return mined
+
+def seed_recurring_programs() -> list:
+    return [
+        {
+            "key": normalize_program_name(p["name"]),
+            "name": p["name"],
+            "agency": p["agency"],
+            "month": int(p["expected_month"].rstrip("월")),
+            "category": p["category"],
+            "keywords": [k.lower() for k in p["keywords"]],
+            "occurrences": 0,
+        }
+        for p in RECURRING_PROGRAMS
+    ]
+
+def build_expected_index(mined: list) -> dict:
+    """키워드 역색인 - exact: 키워드 → 사업, fragments: 키워드의 부분 문자열 → 사업
+
+    기존 매칭 규칙(질의 키워드 ⊂ 사업 키워드 또는 사업 키워드 ⊂ 질의 키워드)을
+    사업 × 키워드 전체 비교 없이 사전 조회로 처리
+    """
+    programs = {p["key"]: p for p in seed_recurring_programs()}
+    seeds = set(programs)
+    for program in mined:
+        seed = programs.get(program["key"])
+        if seed:
+            # 수동 목록의 분류/키워드는 유지하고 월은 실제 이력을 따름
+            program = {**program, "category": seed["category"],
+                       "keywords": seed["keywords"] + [k for k in program["keywords"] if k not in seed["keywords"]]}
+        programs[program["key"]] = program
+    # 색인 순서 = 동점일 때 우선순위 (수동 목록 → 반복 횟수 많은 순)
+    programs = sorted(programs.values(), key=lambda p: -p["occurrences"] if p["key"] not in seeds else -10 ** 9)
+    
+    exact = defaultdict(set)
+    fragments = defaultdict(set)
+    for doc, program in enumerate(programs):
+        for keyword in program["keywords"]:
+            exact[keyword].add(doc)
+            for start in range(len(keyword)):
+                for end in range(start + 1, len(keyword) + 1):
+                    fragments[keyword[start:end]].add(doc)
+    return {
+        "programs": programs,
+        "exact": dict(exact),
+        "fragments": dict(fragments),
+        "max_keyword_length": max(map(len, exact), default=0),
+        "mined": len(mined),
+        "built_at": datetime.now().isoformat(),
+    }
+
+expected_index = build_expected_index([])  # 시작 시 저장소 이력으로 다시 만듦
+
+def rebuild_expected_index():
+    """저장소 이력으로 예상 공고 색인을 다시 만듦 (저장소가 없으면 수동 목록만)"""
+    global expected_index
+    mined = mine_recurring_programs(load_program_history()) if PROGRAM_DB_PATH else []
+    expected_index = build_expected_index(mined)
+
+async def refresh_expected_index():
+    try:
+        await asyncio.to_thread(rebuild_expected_index)
+    except Exception as e:
+        logger.warning(f"예상 공고 색인 오류: {e}")
+
+def next_expected_month(month: int, today: Optional[date] = None) -> tuple:
+    """오늘 기준 다음 공고 예상 (연도, 월) - 이번 달이면 올해로 봄"""
+    today = today or date.today()
+    return (today.year if month >= today.month else today.year + 1), month
+
+def format_expected_program(program: dict, today: date, **extra) -> dict:
+    year, month = next_expected_month(program["month"], today)
+    return {
+        "name": program["name"],
+        "agency": program["agency"],
+        "expected_month": f"{year}년 {month}월",
+        "category": program["category"],
+        **extra,
+        "type": "expected"
+    }
+
+@observe_stage("expected_lookup")
+def get_expected_programs(keywords: List[str], limit: int = 5) -> list:
+    index = expected_index
+    match_counts = Counter()
+    for kw in (k.strip().lower() for k in keywords):
+        if not kw:
+            continue
+        # 사업 키워드가 kw를 포함(fragments) + kw가 사업 키워드를 포함(kw의 부분 문자열을 exact에서 조회)
+        # 색인된 키워드보다 긴 부분 문자열은 exact에 있을 수 없으므로 O(len(kw) × 최장 키워드)
+        postings = [index["fragments"].get(kw, ())]
+        for start in range(len(kw)):
+            for end in range(start + 1, min(len(kw), start + index["max_keyword_length"]) + 1):
+                postings.append(index["exact"].get(kw[start:end], ()))
+        match_counts.update(set().union(*postings))
+    
+    # 점수 내림차순, 같으면 색인 순서(반복 횟수 많은 순)
+    top = heapq.nsmallest(limit, match_counts.items(), key=lambda item: (-item[1], item[0]))
+    today = date.today()
+    return [
+        format_expected_program(index["programs"][doc], today, match_score=min(95, 70 + count * 10))
+        for doc, count in top
+    ]
+
+def get_upcoming_programs(limit: int = 5) -> list:
+    """키워드 없이 조회하면 오늘 기준 가장 가까운 예상 공고"""
+    today = date.today()
+    upcoming = sorted(
+        expected_index["programs"],
+        key=lambda p: (next_expected_month(p["month"], today), -p["occurrences"])
+    )[:limit]
+    return [format_expected_program(p, today, keywords=p["keywords"]) for p in upcoming]
+
+# ============================================
+# N2B 분석 프롬프트 / 결과 캐시
+# ============================================
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "512"))  # 메모리 LRU 항목 수
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", "604800"))  # 기본 7일
+ANALYSIS_CACHE_DB_PATH = os.getenv("ANALYSIS_CACHE_DB_PATH", "")  # 설정하면 디스크(SQLite)에도 저장
+
+analysis_cache = OrderedDict()  # key -> (저장 시각, 결과)
+analysis_cache_stats = defaultdict(int)
+
+def build_analysis_prompt(proposal_text: str) -> str:
+    return f"""다음 기업 정보를 N2B 프레임워크로 분석해주세요.
+
+기업 정보:
+{proposal_text}
+
+N2B 분석:
+- N (Not/문제점): 현재 기업이 직면한 핵심 문제
+- B (But/해결책): 문제를 해결할 수 있는 방안
+- B (Because/근거): 왜 이 해결책이 효과적인지
+- 키워드: 정부지원사업 검색에 활용할 핵심 키워드 5개
+
+JSON 형식으로만 응답 (다른 텍스트 없이):
+{{"not": "...", "but": "...", "because": "...", "keywords": ["키워드1", "키워드2", "키워드3", "키워드4", "키워드5"]}}"""
+
+def analysis_cache_key(model: str, prompt: str) -> str:
+    """모델 + 공백을 정규화한 프롬프트의 해시"""
+    normalized = " ".join(unicodedata.normalize("NFC", prompt).split())
+    return hashlib.sha256(f"{model}\n{normalized}".encode()).hexdigest()
+
+def open_analysis_cache_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(ANALYSIS_CACHE_DB_PATH, timeout=10)
+    conn.execute("CREATE TABLE IF NOT EXISTS analysis_cache (key TEXT PRIMARY KEY, result TEXT NOT NULL, stored_at REAL NOT NULL)")
+    return conn
+
+def read_analysis_from_disk(key: str) -> Optional[tuple]:
+    conn = open_analysis_cache_db()
+    try:
+        with conn:
+            row = conn.execute("SELECT stored_at, result FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+            if row and time.time() - row[0] >= ANALYSIS_CACHE_TTL:
+                conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                return None
+            return row
+    finally:
+        conn.close()
+
+def write_analysis_to_disk(key: str, result: str, stored_at: float):
+    conn = open_analysis_cache_db()
+    try:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO analysis_cache (key, result, stored_at) VALUES (?, ?, ?)", (key, result, stored_at))
+    finally:
+        conn.close()
+
+def remember_analysis(key: str, result: str, stored_at: float):
+    analysis_cache[key] = (stored_at, result)
+    analysis_cache.move_to_end(key)
+    while len(analysis_cache) > ANALYSIS_CACHE_SIZE:
+        analysis_cache.popitem(last=False)
+
+async def get_cached_analysis(key: str) -> Optional[str]:
+    """메모리 → 디스크 순으로 조회 (만료된 항목은 무시)"""
+    entry = analysis_cache.get(key)
+    if entry and time.time() - entry[0] < ANALYSIS_CACHE_TTL:
+        analysis_cache.move_to_end(key)
+        analysis_cache_stats["memory_hits"] += 1
+        return entry[1]
+    if entry:
+        del analysis_cache[key]
+    
+    if ANALYSIS_CACHE_DB_PATH:
+        try:
+            row = await asyncio.to_thread(read_analysis_from_disk, key)
+        except Exception as e:
+            logger.warning(f"분석 캐시 조회 오류: {e}")
+            row = None
+        if row:
+            remember_analysis(key, row[1], row[0])
+            analysis_cache_stats["disk_hits"] += 1
+            return row[1]
+    
+    analysis_cache_stats["misses"] += 1
+    return None
+
+async def store_analysis(key: str, result: str):
+    stored_at = time.time()
+    remember_analysis(key, result, stored_at)
+    if ANALYSIS_CACHE_DB_PATH:
+        try:
+            await asyncio.to_thread(write_analysis_to_disk, key, result, stored_at)
+        except Exception as e:
+            logger.warning(f"분석 캐시 저장 오류: {e}")
+
+# ============================================
+# 배치 분석 (동시 처리 제한 + 결과 스트리밍)
+# ============================================
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "100"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))  # 기본 동시 분석 수
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))  # 요청에서 지정할 수 있는 최대값
+
+async def run_analysis(api_key: str, proposal_text: str) -> tuple:
+    """N2B 분석 1건 → (결과 텍스트, 캐시 적중 여부)"""
+    prompt = build_analysis_prompt(proposal_text)
+    cache_key = analysis_cache_key(CLAUDE_MODEL, prompt)
+    cached = await get_cached_analysis(cache_key)
+    if cached is not None:
+        return cached, True
+    
+    message = await create_message(
+        api_key,
+        model=CLAUDE_MODEL,
+        max_tokens=2000,
+        messages=[
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    )
+    
+    result = message.content[0].text
+    await store_analysis(cache_key, result)
+    return result, False
+
+def ndjson_line(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+async def stream_batch_analysis(api_key: str, texts: list, concurrency: int):
+    """항목별로 독립 실행 - 한 건이 실패해도 나머지는 계속 진행"""
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def analyze_item(index: int, text: str) -> dict:
+        async with semaphore:
+            try:
+                result, cached = await run_analysis(api_key, text)
+                return {"index": index, "success": True, "result": result, "cached": cached}
+            except HTTPException as e:
+                return {"index": index, "success": False, "status": e.status_code, "error": e.detail}
+            except Exception as e:
+                return {"index": index, "success": False, "status": 500, "error": str(e)}
+    
+    tasks = [asyncio.create_task(analyze_item(i, text)) for i, text in enumerate(texts)]
+    succeeded = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            item = await next_done
+            succeeded += item["success"]
+            yield ndjson_line(item)
+        yield ndjson_line({"done": True, "total": len(texts), "succeeded": succeeded, "failed": len(texts) - succeeded})
+    finally:
+        # 클라이언트가 연결을 끊으면 남은 작업 취소
+        for task in tasks:
+            task.cancel()
+
+def batch_custom_id(index: int, cache_key: str) -> str:
+    """custom_id에 분석 캐시 키를 함께 담음 (64자 제한이라 base64url) - 결과 조회 때 캐시에 저장"""
+    token = base64.urlsafe_b64encode(bytes.fromhex(cache_key)).decode().rstrip("=")
+    return f"item-{index}-{token}"
+
+def parse_batch_custom_id(custom_id: str) -> tuple:
+    """→ (항목 번호, 캐시 키 또는 None) - 키가 없는 예전 형식 item-{index}도 허용"""
+    _, index, *token = custom_id.split("-", 2)
+    cache_key = base64.urlsafe_b64decode(token[0] + "=").hex() if token else None
+    return int(index), cache_key
+
+async def submit_analysis_batch(api_key: str, texts: list) -> dict:
+    """캐시에 없는 항목만 Message Batches API로 제출 (비용 절감, 결과는 나중에 조회)"""
+    cached_items = []
+    requests = []
+    for index, text in enumerate(texts):
+        prompt = build_analysis_prompt(text)
+        cache_key = analysis_cache_key(CLAUDE_MODEL, prompt)
+        cached = await get_cached_analysis(cache_key)
+        if cached is not None:
+            cached_items.append({"index": index, "success": True, "result": cached, "cached": True})
+            continue
+        requests.append({
+            "custom_id": batch_custom_id(index, cache_key),
+            "params": {
+                "model": CLAUDE_MODEL,
+                "max_tokens": 2000,
+                "messages": [{"role": "user", "content": prompt}]
+            }
+        })
+    
+    response = {"mode": "offline", "total": len(texts), "cached": cached_items, "submitted": len(requests)}
+    if requests:
+        batch = await get_llm_client(api_key).messages.batches.create(requests=requests)
+        response.update(batch_id=batch.id, status=batch.processing_status)
+    return response
+
+async def stream_analysis_batch_results(api_key: str, batch_id: str):
+    succeeded = failed = 0
+    decoder = await get_llm_client(api_key).messages.batches.results(batch_id)
+    async for entry in decoder:
+        index, cache_key = parse_batch_custom_id(entry.custom_id)
+        if entry.result.type == "succeeded":
+            succeeded += 1
+            result = entry.result.message.content[0].text
+            if cache_key:
+                # 같은 텍스트를 다시 제출하면 (realtime/offline 모두) 캐시에서 응답
+                await store_analysis(cache_key, result)
+            yield ndjson_line({"index": index, "success": True, "result": result, "cached": False})
+        else:
+            failed += 1
+            yield ndjson_line({"index": index, "success": False, "error": entry.result.type})
+    yield ndjson_line({"done": True, "batch_id": batch_id, "succeeded": succeeded, "failed": failed})
+
+# ============================================
+# 제안서 / PPT 생성 프롬프트
+# ============================================
+def build_proposal_prompt(request: DemoProposalRequest) -> str:
+    return f"""정부 R&D 제안서 초안을 작성해주세요.
+
+## 기업 정보
+{request.companyInfo}
+
+## NBB 분석 결과
+- N (NOT/문제점): {request.n2bResult.get('not', '')}
+- B (BUT/해결책): {request.n2bResult.get('but', '')}
+- B (BECAUSE/근거): {request.n2bResult.get('because', '')}
+
+## 선택한 지원사업
+- 사업명: {request.selectedProgram.get('name', '')}
+- 지원내용: {request.selectedProgram.get('description', '')}
+
+## 작성 양식
+
+### 1. 기술개발 개요
+#### 1.1 개발 필요성
+(NBB의 N을 바탕으로 구체적으로 작성)
+
+#### 1.2 개발 목적
+(NBB의 첫번째 B를 바탕으로 작성)
+
+### 2. 기술개발 목표 및 내용
+#### 2.1 최종 목표
+(정량적 목표 포함)
+
+#### 2.2 세부 개발 내용
+
+### 3. 추진전략 및 일정
+#### 3.1 추진체계
+#### 3.2 추진일정 (1년 기준)
+
+### 4. 기대효과 및 활용방안
+(NBB의 두번째 B를 바탕으로 작성)
+
+### 5. 소요예산 개요
+
+실제 제출용처럼 구체적이고 설득력 있게 작성해주세요."""
+
+def build_ppt_prompt(request: DemoPptRequest) -> str:
+    return f"""발표자료(PPT) 구성안을 작성해주세요.
+
+## 기업 정보
+{request.companyInfo}
+
+## NBB 분석 결과
+- N (NOT): {request.n2bResult.get('not', '')}
+- B (BUT): {request.n2bResult.get('but', '')}
+- B (BECAUSE): {request.n2bResult.get('because', '')}
+
+## 선택한 지원사업: {request.selectedProgram.get('name', '')}
+
+## 발표자료 구성 (10~12슬라이드)
+
+각 슬라이드별로:
+**슬라이드 N: [제목]**
+- 핵심 내용 1
+- 핵심 내용 2
+- 핵심 내용 3
+[발표 포인트: 강조할 내용]
+
+구성:
+1. 표지
+2. 목차
+3. 기업 소개
+4. 개발 배경 및 필요성
+5. 기술 현황 및 문제점
+6. 개발 목표
+7. 핵심 기술 및 차별성
+8. 개발 내용 및 방법
+9. 추진 일정
+10. 기대 효과
+11. 사업화 계획
+12. 마무리"""
+
+# ============================================
+# SSE 스트리밍
+# ============================================
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def stream_message(api_key: str, **kwargs):
+    """Claude 응답 텍스트 조각을 생성되는 대로 yield"""
+    async with llm_slot():
+        started = time.perf_counter()
+        first_token = True
+        try:
+            async with get_llm_client(api_key).messages.stream(**kwargs) as stream:
+                async for text in stream.text_stream:
+                    if first_token:
+                        llm_ttft.observe(time.perf_counter() - started)
+                        first_token = False
+                    yield text
+                record_llm_usage(await stream.get_final_message())
+        except Exception as e:
+            llm_requests.inc("stream", llm_outcome(e))
+            raise
+        finally:
+            stage_duration.observe(time.perf_counter() - started, "llm_stream")
+        llm_requests.inc("stream", "ok")
+
+def sse_response(chunks, headers: Optional[dict] = None) -> StreamingResponse:
+    """start → delta(토큰 조각)… → done(remaining_requests) 순서의 SSE 응답
+
+    오류가 나면 done 대신 error 이벤트로 종료
+    """
+    async def events():
+        # 첫 바이트를 바로 보내 프록시 타임아웃 방지
+        yield sse_event("start", {})
+        try:
+            async for text in chunks:
+                yield sse_event("delta", {"text": text})
+        except HTTPException as e:
+            yield sse_event("error", {"status": e.status_code, "detail": e.detail})
+            return
+        except Exception as e:
+            yield sse_event("error", {"status": 500, "detail": str(e)})
+            return
+        yield sse_event("done", {"success": True, "remaining_requests": get_remaining_requests()})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(headers or {})},
+    )
+
+# ============================================
+# API 엔드포인트 (기존)
+# ============================================
+
+@app.get("/")
+async def root():
     return {
         "message": "N2B Backend v3.1 - 데모 모드 지원",
         "apis": ["기업마당", "K-Startup"],
@@ -408,97 +2920,125 @@ async def root():
     }
 
 @app.get("/api/programs/bizinfo")
-async def get_bizinfo_programs(keyword: str = None, count: int = 100):
-    programs = await fetch_bizinfo_programs(keyword, count)
-    return {"source": "기업마당", "count": len(programs), "programs": programs}
+async def get_bizinfo_programs(request: Request, keyword: str = None, count: int = 100, limit: int = None,
+                               cursor: str = None, fields: str = None):
+    """카탈로그의 기업마당 사업 (count는 limit의 예전 이름)"""
+    programs = await search_source_programs("기업마당", keyword)
+    return listing_response(request, programs, {"source": "기업마당"}, limit or count, cursor, fields)
 
 @app.get("/api/programs/kstartup")
-async def get_kstartup_programs(keyword: str = None, page: int = 1):
-    programs = await fetch_kstartup_programs(keyword, page)
-    return {"source": "K-Startup", "count": len(programs), "programs": programs}
+async def get_kstartup_programs(request: Request, keyword: str = None, page: int = 1, limit: int = None,
+                                cursor: str = None, fields: str = None):
+    """카탈로그의 K-Startup 사업 (cursor 없이 page를 주면 예전처럼 100개 단위 페이지)"""
+    programs = await search_source_programs("K-Startup", keyword)
+    offset = (page - 1) * 100 if page > 1 and not limit else 0
+    return listing_response(request, programs, {"source": "K-Startup"}, limit or 100, cursor, fields, offset)
 
 @app.get("/api/programs/all")
-async def get_all_programs(keyword: str = None, region: str = "전체"):
+async def get_all_programs(request: Request, keyword: str = None, region: str = "전체", limit: int = None,
+                           cursor: str = None, fields: str = None):
+    """통합 목록 - limit/cursor로 페이지 단위, fields=id,name,period 로 필요한 필드만"""
     programs = await search_all_programs(keyword, region)
-    return {"count": len(programs), "region": region, "programs": programs}
+    return listing_response(request, programs, {"region": region}, limit, cursor, fields)
+
+@app.get("/api/catalog/status")
+async def catalog_status():
+    return get_catalog_status()
+
+@app.post("/api/programs/rank")
+async def rank_programs_api(request: RankRequest):
+    """N2B 분석과의 관련도(BM25) 순 지원사업 목록"""
+    programs = await search_all_programs(region=request.region)
+    ranked = rank_programs(programs, request.n2bAnalysis, max(1, request.topK))
+    return FastJSONResponse({
+        "count": len(ranked),
+        "total_programs": len(programs),
+        "region": request.region,
+        "programs": [{**p, "score": round(score, 4)} for p, score in ranked]
+    })
 
 @app.post("/analyze")
 async def analyze(request: AnalyzeRequest):
     try:
-        client = anthropic.Anthropic(api_key=request.apiKey)
+        result, cached = await run_analysis(request.apiKey, request.proposalText)
+        return {"success": True, "result": result, "cached": cached}
         
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=2000,
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"""다음 기업 정보를 N2B 프레임워크로 분석해주세요.
-
-기업 정보:
-{request.proposalText}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-N2B 분석:
-- N (Not/문제점): 현재 기업이 직면한 핵심 문제
-- B (But/해결책): 문제를 해결할 수 있는 방안
-- B (Because/근거): 왜 이 해결책이 효과적인지
-- 키워드: 정부지원사업 검색에 활용할 핵심 키워드 5개
+@app.post("/analyze/batch")
+async def analyze_batch(request: BatchAnalyzeRequest):
+    """여러 기업을 한 번에 분석 - 끝나는 순서대로 NDJSON 한 줄씩 전송
+
+    mode="offline"이면 Message Batches API로 제출하고 batch_id를 반환
+    """
+    texts = request.proposalTexts
+    if not texts:
+        raise HTTPException(status_code=400, detail="proposalTexts가 비어 있습니다.")
+    if len(texts) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {BATCH_MAX_ITEMS}건까지 분석할 수 있습니다.")
+    
+    if request.mode == "offline":
+        try:
+            return await submit_analysis_batch(request.apiKey, texts)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    if request.mode != "realtime":
+        raise HTTPException(status_code=400, detail="mode는 realtime 또는 offline 이어야 합니다.")
+    
+    concurrency = max(1, min(request.concurrency or BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY))
+    return StreamingResponse(
+        stream_batch_analysis(request.apiKey, texts, concurrency),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-JSON 형식으로만 응답 (다른 텍스트 없이):
-{{"not": "...", "but": "...", "because": "...", "keywords": ["키워드1", "키워드2", "키워드3", "키워드4", "키워드5"]}}"""
-                }
-            ]
-        )
-        
-        return {"success": True, "result": message.content[0].text}
-        
+@app.post("/analyze/batch/{batch_id}/results")
+async def analyze_batch_results(batch_id: str, request: BatchResultsRequest):
+    """offline 배치 결과 조회 - 처리 중이면 상태만, 끝났으면 NDJSON으로 결과 전송"""
+    try:
+        batch = await get_llm_client(request.apiKey).messages.batches.retrieve(batch_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if batch.processing_status != "ended":
+        return JSONResponse(status_code=202, content={
+            "batch_id": batch.id,
+            "status": batch.processing_status,
+            "request_counts": batch.request_counts.model_dump()
+        })
+    
+    return StreamingResponse(
+        stream_analysis_batch_results(request.apiKey, batch.id),
+        media_type="application/x-ndjson",
+    )
 
 @app.post("/match")
-async def match_programs(request: MatchRequest):
+async def match_programs(request: MatchRequest, http_request: Request):
+    deadline, catalog_deadline = match_deadlines(http_request)
     try:
         region = request.region if hasattr(request, 'region') else "전체"
         
+        freshness = {}
         if request.useRealtime:
-            all_programs = await search_all_programs(region=region)
+            all_programs = await search_all_programs(region=region, deadline=catalog_deadline, freshness=freshness)
         else:
             all_programs = []
         
-        client = anthropic.Anthropic(api_key=request.apiKey)
-        
         n2b = request.n2bAnalysis
         keywords = n2b.get('keywords', [])
         
-        programs_text = "\n".join([
-            f"- {p['name']} | 기관: {p.get('agency', '')} | 기간: {p.get('period', '미정')} | URL: {p.get('url', '')}" 
-            for p in all_programs[:50]
-        ])
-        
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
+        message = await create_message_by(
+            deadline,
+            request.apiKey,
+            model=CLAUDE_MODEL,
             max_tokens=2000,
             messages=[
                 {
                     "role": "user",
-                    "content": f"""다음 N2B 분석 결과에 가장 적합한 지원사업 5개를 추천해주세요.
-
-N2B 분석:
-- 문제점: {n2b.get('not', '')}
-- 해결책: {n2b.get('but', '')}
-- 근거: {n2b.get('because', '')}
-- 키워드: {', '.join(keywords) if keywords else '없음'}
-
-현재 모집중인 지원사업 (지역: {region}):
-{programs_text if programs_text else '현재 모집중인 사업이 없습니다.'}
-
-JSON 형식으로만 응답 (다른 텍스트 없이):
-[
-  {{"name": "사업명", "agency": "기관", "period": "접수기간", "url": "상세페이지URL", "reason": "추천 이유", "fit_score": 95}},
-  ...
-]
-
-적합한 사업이 없으면 빈 배열 []로 응답."""
+                    "content": build_match_content(n2b, region, all_programs)
                 }
             ]
         )
@@ -509,62 +3049,103 @@ JSON 형식으로만 응답 (다른 텍스트 없이):
         try:
             json_match = re.search(r'\[[\s\S]*\]', ai_result)
             if json_match:
-                matched_programs = json.loads(json_match.group())
-                for mp in matched_programs:
-                    for op in all_programs:
-                        if mp.get('name') and op.get('name') and mp['name'] in op['name']:
-                            mp['url'] = op.get('url', '')
-                            mp['period'] = op.get('period', mp.get('period', ''))
-                            break
+                matched_programs = reconcile_matches(json.loads(json_match.group()), all_programs)
                 ai_result = json.dumps(matched_programs, ensure_ascii=False)
         except:
             pass
         
-        return {
+        return FastJSONResponse({
             "success": True, 
             "total_programs": len(all_programs),
             "region": region,
             "result": ai_result,
-            "expected_programs": expected_programs
-        }
+            "expected_programs": expected_programs,
+            "catalog_sources": freshness,
+            "prompt_cache": prompt_cache_usage(message)
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/programs/expected")
 async def get_expected_programs_api(keywords: str = ""):
     keyword_list = [k.strip() for k in keywords.split(",") if k.strip()]
-    expected = get_expected_programs(keyword_list) if keyword_list else RECURRING_PROGRAMS[:5]
+    if len(keyword_list) > EXPECTED_QUERY_MAX_KEYWORDS or any(len(k) > EXPECTED_QUERY_MAX_LENGTH for k in keyword_list):
+        raise HTTPException(
+            status_code=400,
+            detail=f"키워드는 최대 {EXPECTED_QUERY_MAX_KEYWORDS}개, 각 {EXPECTED_QUERY_MAX_LENGTH}자까지 입력할 수 있습니다."
+        )
+    expected = get_expected_programs(keyword_list) if keyword_list else get_upcoming_programs()
     return {"count": len(expected), "programs": expected}
 
 @app.get("/health")
 async def health_check():
-    bizinfo_ok = False
-    kstartup_ok = False
-    
-    try:
-        bizinfo = await fetch_bizinfo_programs(count=1)
-        bizinfo_ok = len(bizinfo) > 0
-    except:
-        pass
-    
-    try:
-        kstartup = await fetch_kstartup_programs(per_page=1)
-        kstartup_ok = len(kstartup) > 0
-    except:
-        pass
-    
+    """프로세스 생존 확인 - 업스트림 상태는 백그라운드 프로버가 기록한 값을 그대로 반환"""
+    upstreams = get_upstream_health()
     return {
         "status": "healthy",
         "version": "3.1",
-        "apis": {
-            "bizinfo": "connected" if bizinfo_ok else "error",
-            "kstartup": "connected" if kstartup_ok else "error"
-        },
+        "apis": {name: state["status"] for name, state in upstreams.items()},
+        "upstreams": upstreams,
         "features": ["keywords", "region_filter", "expected_programs", "demo_mode"],
         "demo_remaining": get_remaining_requests()
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """트래픽을 받을 준비가 됐는지 - 카탈로그 신선도 기준 (준비 안 됐으면 503)"""
+    ready, sources = get_readiness()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "max_catalog_age": READY_MAX_CATALOG_AGE, "sources": sources}
+    )
+
+def collect_stats_metrics() -> list:
+    """기존 통계 dict들을 Prometheus 형식으로 (수집 시점에 읽음)"""
+    lines = []
+    lines += counter_lines("n2b_catalog_events_total", "카탈로그 캐시 이벤트", "event", catalog_stats)
+    lines += counter_lines("n2b_listing_events_total", "목록 응답 캐시 이벤트", "event", listing_stats)
+    lines += counter_lines("n2b_analysis_cache_events_total", "분석 캐시 이벤트", "event", analysis_cache_stats)
+    lines += counter_lines("n2b_rate_limit_decisions_total", "rate limit 판정", "decision", rate_limit_stats)
+    lines += counter_lines("n2b_retry_budget_events_total", "재시도/헤지 예산 사용", "event", retry_budget.stats)
+    lines += counter_lines("n2b_llm_queue_rejections_total", "대기열 시간 초과로 거절된 Claude 호출", "reason",
+                           {"queue_timeout": llm_stats["rejected"]})
+    lines += counter_lines("n2b_llm_slots", "Claude 호출 슬롯 사용 현황", "state",
+                           {"in_flight": llm_stats["in_flight"], "waiting": llm_stats["waiting"]}, "gauge")
+    
+    lines += ["# HELP n2b_singleflight_calls_total single-flight 호출 (coalesced는 합쳐진 호출)",
+              "# TYPE n2b_singleflight_calls_total counter"]
+    for flight in (upstream_flight, llm_flight):
+        for kind in ("executions", "coalesced", "errors"):
+            lines.append(f"n2b_singleflight_calls_total{format_labels(('group', 'kind'), (flight.name, kind))} {flight.stats[kind]}")
+    
+    lines += ["# HELP n2b_circuit_breaker_state 업스트림 서킷 브레이커 상태 (현재 상태만 1)",
+              "# TYPE n2b_circuit_breaker_state gauge"]
+    for name, breaker in upstream_breakers.items():
+        for state in ("closed", "open", "half_open"):
+            lines.append(f"n2b_circuit_breaker_state{format_labels(('upstream', 'state'), (name, state))} {int(breaker.state == state)}")
+    lines += ["# HELP n2b_circuit_breaker_transitions_total 서킷 브레이커 상태 전이",
+              "# TYPE n2b_circuit_breaker_transitions_total counter"]
+    for name, breaker in upstream_breakers.items():
+        for transition, count in sorted(breaker.transitions.items()):
+            lines.append(f"n2b_circuit_breaker_transitions_total{format_labels(('upstream', 'transition'), (name, transition))} {count}")
+    
+    now = time.time()
+    ages = {source: now - entry["fetched_at"] for source, entry in catalog_entries.items() if entry}
+    lines += counter_lines("n2b_catalog_age_seconds", "소스별 카탈로그 나이", "source", ages, "gauge")
+    lines += counter_lines("n2b_catalog_programs", "소스별 카탈로그 사업 수", "source",
+                           {source: len(entry["programs"]) for source, entry in catalog_entries.items() if entry}, "gauge")
+    return lines
+
+metrics_collectors.append(collect_stats_metrics)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 스크레이프용 (uvicorn 워커마다 따로 집계되므로 워커별로 수집)"""
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 
 # ============================================
 # 데모용 엔드포인트 (API 키 내장)
@@ -576,107 +3157,85 @@ async def demo_status():
     return {
         "available": bool(DEMO_ANTHROPIC_API_KEY),
         "remaining_requests": get_remaining_requests(),
-        "max_daily_requests": MAX_DAILY_REQUESTS
+        "max_daily_requests": MAX_DAILY_REQUESTS,
+        "client_burst": RATE_LIMIT_CLIENT_BURST,
+        "client_refill_per_hour": RATE_LIMIT_CLIENT_REFILL_PER_HOUR,
+        "analysis_cache": {
+            "size": len(analysis_cache),
+            "memory_hits": analysis_cache_stats["memory_hits"],
+            "disk_hits": analysis_cache_stats["disk_hits"],
+            "misses": analysis_cache_stats["misses"]
+        },
+        "llm": {
+            "in_flight": llm_stats["in_flight"],
+            "waiting": llm_stats["waiting"],
+            "max_concurrency": LLM_MAX_CONCURRENCY,
+            "singleflight": llm_flight.status()
+        }
     }
 
 @app.post("/demo/analyze")
-async def demo_analyze(request: DemoAnalyzeRequest):
+async def demo_analyze(request: DemoAnalyzeRequest, http_request: Request, response: Response):
     """데모용 N2B 분석 (API 키 내장)"""
     if not DEMO_ANTHROPIC_API_KEY:
         raise HTTPException(status_code=503, detail="데모 모드가 설정되지 않았습니다.")
     
-    if not check_rate_limit():
-        raise HTTPException(status_code=429, detail=f"일일 요청 한도 초과 (최대 {MAX_DAILY_REQUESTS}회)")
+    prompt = build_analysis_prompt(request.proposalText)
+    cache_key = analysis_cache_key(CLAUDE_MODEL, prompt)
+    
+    # 캐시 적중은 요청 한도를 차감하지 않음
+    cached = await get_cached_analysis(cache_key)
+    if cached is not None:
+        return {
+            "success": True,
+            "result": cached,
+            "cached": True,
+            "remaining_requests": get_remaining_requests()
+        }
+    
+    enforce_rate_limit(http_request, response)
     
     try:
-        client = anthropic.Anthropic(api_key=DEMO_ANTHROPIC_API_KEY)
-        
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
+        message = await create_message(
+            DEMO_ANTHROPIC_API_KEY,
+            model=CLAUDE_MODEL,
             max_tokens=2000,
             messages=[{
                 "role": "user",
-                "content": f"""다음 기업 정보를 N2B 프레임워크로 분석해주세요.
-
-기업 정보:
-{request.proposalText}
-
-N2B 분석:
-- N (Not/문제점): 현재 기업이 직면한 핵심 문제
-- B (But/해결책): 문제를 해결할 수 있는 방안
-- B (Because/근거): 왜 이 해결책이 효과적인지
-- 키워드: 정부지원사업 검색에 활용할 핵심 키워드 5개
-
-JSON 형식으로만 응답 (다른 텍스트 없이):
-{{"not": "...", "but": "...", "because": "...", "keywords": ["키워드1", "키워드2", "키워드3", "키워드4", "키워드5"]}}"""
+                "content": prompt
             }]
         )
         
+        result = message.content[0].text
+        await store_analysis(cache_key, result)
         return {
             "success": True, 
-            "result": message.content[0].text,
+            "result": result,
+            "cached": False,
             "remaining_requests": get_remaining_requests()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/demo/proposal")
-async def demo_generate_proposal(request: DemoProposalRequest):
+async def demo_generate_proposal(request: DemoProposalRequest, http_request: Request, response: Response):
     """데모용 제안서 생성 (API 키 내장)"""
     if not DEMO_ANTHROPIC_API_KEY:
         raise HTTPException(status_code=503, detail="데모 모드가 설정되지 않았습니다.")
     
-    if not check_rate_limit():
-        raise HTTPException(status_code=429, detail=f"일일 요청 한도 초과 (최대 {MAX_DAILY_REQUESTS}회)")
+    enforce_rate_limit(http_request, response)
     
     try:
-        client = anthropic.Anthropic(api_key=DEMO_ANTHROPIC_API_KEY)
-        
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
+        message = await create_message(
+            DEMO_ANTHROPIC_API_KEY,
+            model=CLAUDE_MODEL,
             max_tokens=4000,
             messages=[{
                 "role": "user",
-                "content": f"""정부 R&D 제안서 초안을 작성해주세요.
-
-## 기업 정보
-{request.companyInfo}
-
-## NBB 분석 결과
-- N (NOT/문제점): {request.n2bResult.get('not', '')}
-- B (BUT/해결책): {request.n2bResult.get('but', '')}
-- B (BECAUSE/근거): {request.n2bResult.get('because', '')}
-
-## 선택한 지원사업
-- 사업명: {request.selectedProgram.get('name', '')}
-- 지원내용: {request.selectedProgram.get('description', '')}
-
-## 작성 양식
-
-### 1. 기술개발 개요
-#### 1.1 개발 필요성
-(NBB의 N을 바탕으로 구체적으로 작성)
-
-#### 1.2 개발 목적
-(NBB의 첫번째 B를 바탕으로 작성)
-
-### 2. 기술개발 목표 및 내용
-#### 2.1 최종 목표
-(정량적 목표 포함)
-
-#### 2.2 세부 개발 내용
-
-### 3. 추진전략 및 일정
-#### 3.1 추진체계
-#### 3.2 추진일정 (1년 기준)
-
-### 4. 기대효과 및 활용방안
-(NBB의 두번째 B를 바탕으로 작성)
-
-### 5. 소요예산 개요
-
-실제 제출용처럼 구체적이고 설득력 있게 작성해주세요."""
+                "content": build_proposal_prompt(request)
             }]
         )
         
@@ -686,62 +3245,61 @@ async def demo_generate_proposal(request: DemoProposalRequest):
             "remaining_requests": get_remaining_requests()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/demo/proposal/stream")
+async def demo_generate_proposal_stream(request: DemoProposalRequest, http_request: Request):
+    """데모용 제안서 생성 - 생성되는 대로 SSE로 전송"""
+    if not DEMO_ANTHROPIC_API_KEY:
+        raise HTTPException(status_code=503, detail="데모 모드가 설정되지 않았습니다.")
+    
+    rate_headers = enforce_rate_limit(http_request)
+    
+    return sse_response(stream_message(
+        DEMO_ANTHROPIC_API_KEY,
+        model=CLAUDE_MODEL,
+        max_tokens=4000,
+        messages=[{
+            "role": "user",
+            "content": build_proposal_prompt(request)
+        }]
+    ), headers=rate_headers)
+
 class DemoMatchRequest(BaseModel):
     n2bAnalysis: dict
     region: str = "전체"
 
 @app.post("/demo/match")
-async def demo_match_programs(request: DemoMatchRequest):
+async def demo_match_programs(request: DemoMatchRequest, http_request: Request):
     """데모용 정책 매칭 (API 키 내장)"""
     if not DEMO_ANTHROPIC_API_KEY:
         raise HTTPException(status_code=503, detail="데모 모드가 설정되지 않았습니다.")
     
-    if not check_rate_limit():
-        raise HTTPException(status_code=429, detail=f"일일 요청 한도 초과 (최대 {MAX_DAILY_REQUESTS}회)")
+    deadline, catalog_deadline = match_deadlines(http_request)
+    rate_headers = enforce_rate_limit(http_request)
     
     try:
         region = request.region
         
-        # 실시간 API에서 지원사업 가져오기
-        all_programs = await search_all_programs(region=region)
-        
-        client = anthropic.Anthropic(api_key=DEMO_ANTHROPIC_API_KEY)
+        # 카탈로그에서 지원사업 가져오기 (마감 안에 못 받은 소스는 스냅샷/제외)
+        freshness = {}
+        all_programs = await search_all_programs(region=region, deadline=catalog_deadline, freshness=freshness)
         
         n2b = request.n2bAnalysis
         keywords = n2b.get('keywords', [])
         
-        programs_text = "\n".join([
-            f"- {p['name']} | 기관: {p.get('agency', '')} | 기간: {p.get('period', '미정')} | URL: {p.get('url', '')}" 
-            for p in all_programs[:50]
-        ])
-        
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
+        message = await create_message_by(
+            deadline,
+            DEMO_ANTHROPIC_API_KEY,
+            model=CLAUDE_MODEL,
             max_tokens=2000,
             messages=[
                 {
                     "role": "user",
-                    "content": f"""다음 N2B 분석 결과에 가장 적합한 지원사업 5개를 추천해주세요.
-
-N2B 분석:
-- 문제점: {n2b.get('not', '')}
-- 해결책: {n2b.get('but', '')}
-- 근거: {n2b.get('because', '')}
-- 키워드: {', '.join(keywords) if keywords else '없음'}
-
-현재 모집중인 지원사업 (지역: {region}):
-{programs_text if programs_text else '현재 모집중인 사업이 없습니다.'}
-
-JSON 형식으로만 응답 (다른 텍스트 없이):
-[
-  {{"name": "사업명", "agency": "기관", "period": "접수기간", "url": "상세페이지URL", "reason": "추천 이유", "fit_score": 95}},
-  ...
-]
-
-적합한 사업이 없으면 빈 배열 []로 응답."""
+                    "content": build_match_content(n2b, region, all_programs)
                 }
             ]
         )
@@ -752,80 +3310,43 @@ JSON 형식으로만 응답 (다른 텍스트 없이):
         try:
             json_match = re.search(r'\[[\s\S]*\]', ai_result)
             if json_match:
-                matched_programs = json.loads(json_match.group())
-                for mp in matched_programs:
-                    for op in all_programs:
-                        if mp.get('name') and op.get('name') and mp['name'] in op['name']:
-                            mp['url'] = op.get('url', '')
-                            mp['period'] = op.get('period', mp.get('period', ''))
-                            break
+                matched_programs = reconcile_matches(json.loads(json_match.group()), all_programs)
                 ai_result = json.dumps(matched_programs, ensure_ascii=False)
         except:
             pass
         
-        return {
+        return FastJSONResponse({
             "success": True, 
             "total_programs": len(all_programs),
             "region": region,
             "result": ai_result,
             "expected_programs": expected_programs,
+            "catalog_sources": freshness,
+            "prompt_cache": prompt_cache_usage(message),
             "remaining_requests": get_remaining_requests()
-        }
+        }, headers=rate_headers)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/demo/ppt")
-async def demo_generate_ppt(request: DemoPptRequest):
+async def demo_generate_ppt(request: DemoPptRequest, http_request: Request, response: Response):
     """데모용 PPT 구성안 생성 (API 키 내장)"""
     if not DEMO_ANTHROPIC_API_KEY:
         raise HTTPException(status_code=503, detail="데모 모드가 설정되지 않았습니다.")
     
-    if not check_rate_limit():
-        raise HTTPException(status_code=429, detail=f"일일 요청 한도 초과 (최대 {MAX_DAILY_REQUESTS}회)")
+    enforce_rate_limit(http_request, response)
     
     try:
-        client = anthropic.Anthropic(api_key=DEMO_ANTHROPIC_API_KEY)
-        
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
+        message = await create_message(
+            DEMO_ANTHROPIC_API_KEY,
+            model=CLAUDE_MODEL,
             max_tokens=3000,
             messages=[{
                 "role": "user",
-                "content": f"""발표자료(PPT) 구성안을 작성해주세요.
-
-## 기업 정보
-{request.companyInfo}
-
-## NBB 분석 결과
-- N (NOT): {request.n2bResult.get('not', '')}
-- B (BUT): {request.n2bResult.get('but', '')}
-- B (BECAUSE): {request.n2bResult.get('because', '')}
-
-## 선택한 지원사업: {request.selectedProgram.get('name', '')}
-
-## 발표자료 구성 (10~12슬라이드)
-
-각 슬라이드별로:
-**슬라이드 N: [제목]**
-- 핵심 내용 1
-- 핵심 내용 2
-- 핵심 내용 3
-[발표 포인트: 강조할 내용]
-
-구성:
-1. 표지
-2. 목차
-3. 기업 소개
-4. 개발 배경 및 필요성
-5. 기술 현황 및 문제점
-6. 개발 목표
-7. 핵심 기술 및 차별성
-8. 개발 내용 및 방법
-9. 추진 일정
-10. 기대 효과
-11. 사업화 계획
-12. 마무리"""
+                "content": build_ppt_prompt(request)
             }]
         )
         
@@ -835,5 +3356,25 @@ async def demo_generate_ppt(request: DemoPptRequest):
             "remaining_requests": get_remaining_requests()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/demo/ppt/stream")
+async def demo_generate_ppt_stream(request: DemoPptRequest, http_request: Request):
+    """데모용 PPT 구성안 생성 - 생성되는 대로 SSE로 전송"""
+    if not DEMO_ANTHROPIC_API_KEY:
+        raise HTTPException(status_code=503, detail="데모 모드가 설정되지 않았습니다.")
+    
+    rate_headers = enforce_rate_limit(http_request)
+    
+    return sse_response(stream_message(
+        DEMO_ANTHROPIC_API_KEY,
+        model=CLAUDE_MODEL,
+        max_tokens=3000,
+        messages=[{
+            "role": "user",
+            "content": build_ppt_prompt(request)
+        }]
+    ), headers=rate_headers)